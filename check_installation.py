@@ -5,6 +5,12 @@ Verify that all dependencies are installed correctly
 
 import sys
 import os
+import importlib.util
+
+try:
+    import importlib.metadata as importlib_metadata
+except ImportError:  # Python 3.7
+    importlib_metadata = None
 
 def check_python_version():
     """Check Python version"""
@@ -23,17 +29,25 @@ def check_module(module_name, package_name=None):
     if package_name is None:
         package_name = module_name
     
-    try:
+    # find_spec locates the module without executing it (yt_dlp is slow to import)
+    if importlib.util.find_spec(module_name) is None:
+        print(f"❌ {package_name} not installed!")
+        print(f"   Install with: pip install {package_name}")
+        return False
+    
+    if importlib_metadata is not None:
+        try:
+            version = importlib_metadata.version(package_name)
+        except importlib_metadata.PackageNotFoundError:
+            version = 'N/A'  # e.g. standard library modules
+    else:
         module = __import__(module_name)
         version = getattr(module, '__version__', 'N/A')
         if hasattr(module, 'version'):
             version = getattr(module.version, '__version__', version)
-        print(f"✅ {package_name}: {version}")
-        return True
-    except ImportError:
-        print(f"❌ {package_name} not installed!")
-        print(f"   Install with: pip install {package_name}")
-        return False
+    
+    print(f"✅ {package_name}: {version}")
+    return True
 
 def check_files():
     """Check that necessary files exist"""
@@ -43,9 +57,13 @@ def check_files():
         'tiktok_downloader_advanced.py',
     ]
     
+    # One directory listing instead of a stat() per file
+    with os.scandir('.') as entries:
+        present = {entry.name for entry in entries if entry.name in files}
+    
     all_ok = True
     for file in files:
-        if os.path.exists(file):
+        if file in present:
             print(f"✅ {file}")
         else:
             print(f"⚠️  {file} not found")
@@ -4,132 +4,239 @@ Configuration Manager for TikTok Auto Downloader
 Handles loading settings from YAML config file with fallback to defaults
 """
 
+import copy
 import os
-import yaml
+import pickle
+import threading
 from pathlib import Path
 
 
+def _yaml_backend():
+    """
+    Import PyYAML on first use (a warm config cache never needs it)
+
+    Returns:
+        tuple: (yaml module, loader class, dumper class), preferring the
+        libyaml C bindings and falling back to the pure-Python implementation
+    """
+    import yaml
+    try:
+        from yaml import CSafeLoader as loader, CSafeDumper as dumper
+    except ImportError:
+        from yaml import SafeLoader as loader, SafeDumper as dumper
+    return yaml, loader, dumper
+
+
+# Built-in defaults - never mutated, copied once per load
+DEFAULT_CONFIG = {
+    'monitor': {
+        'interval_minutes': 30,
+        'output_dir': './tiktok_downloads',
+        'max_videos_per_check': 5,
+        'anti_bot_delays': {
+            'between_downloads': [5, 15],
+            'between_users': [10, 30]
+        }
+    },
+    'download': {
+        'quality': 'best',
+        'with_audio': True,
+        'geo_bypass': True,
+        'geo_bypass_country': 'US',
+        'parallel_workers': 4,
+        'fragment_concurrency': 8,
+        'retry_backoff_factor': 2,
+        'retry_backoff_cap': 600
+    },
+    'notifications': {
+        'enabled': False,
+        'timeout': 5
+    },
+    'database': {
+        'db_file': 'tiktok_monitor.db'
+    },
+    'logging': {
+        'log_dir': 'logs',
+        'log_level': 'INFO'
+    }
+}
+
+
+# Sentinel for cached lookups of missing keys
+_MISSING = object()
+
+
 class ConfigManager:
-    _instance = None
-    _config = None
+    """
+    Application configuration loaded from config.yaml
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(ConfigManager, cls).__new__(cls)
-        return cls._instance
+    Use ConfigManager.get_instance() rather than constructing it directly,
+    so the file is only read once per process.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+    _lock = threading.Lock()
+    _config_data = None
 
     def __init__(self, config_file="config.yaml"):
-        if self._config is not None:
-            return
-
+        self._get_cache = {}
         self.config_file = config_file
-        self.default_config = {
-            'monitor': {
-                'interval_minutes': 30,
-                'output_dir': './tiktok_downloads',
-                'max_videos_per_check': 5,
-                'anti_bot_delays': {
-                    'between_downloads': [5, 15],
-                    'between_users': [10, 30]
-                }
-            },
-            'download': {
-                'quality': 'best',
-                'with_audio': True,
-                'geo_bypass': True,
-                'geo_bypass_country': 'US'
-            },
-            'notifications': {
-                'enabled': False,
-                'timeout': 5
-            },
-            'database': {
-                'db_file': 'tiktok_monitor.db'
-            },
-            'logging': {
-                'log_dir': 'logs',
-                'log_level': 'INFO'
-            }
-        }
+        self.default_config = DEFAULT_CONFIG
         self.load_config()
 
+    @classmethod
+    def get_instance(cls, config_file="config.yaml"):
+        """
+        Return the shared ConfigManager, building it on first use
+
+        Args:
+            config_file: Config path, only used when the instance is created
+
+        Returns:
+            ConfigManager: The process-wide instance
+        """
+        instance = cls._instance
+        if instance is None:
+            # Double-checked locking: the lock is only taken until the instance exists
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls(config_file)
+                instance = cls._instance
+        return instance
+
+    @property
+    def _config(self):
+        return self._config_data
+
+    @_config.setter
+    def _config(self, value):
+        # Replacing the config invalidates every memoized lookup
+        self._config_data = value
+        self._get_cache = {}
+
     def load_config(self):
         """Load configuration from YAML file or use defaults"""
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r') as f:
-                    loaded_config = yaml.safe_load(f)
-                    if loaded_config:
-                        self._config = self.merge_config(self.default_config, loaded_config)
-                    else:
-                        self._config = self.default_config
-                print(f"✅ Configuration loaded from {self.config_file}")
-            except Exception as e:
-                print(f"❌ Error loading config file: {e}. Using defaults.")
-                self._config = self.default_config
-        else:
+        try:
+            loaded_config = self._load_cached_yaml()
+            if loaded_config:
+                self._config = self.merge_config(self.default_config, loaded_config)
+            else:
+                self._config = copy.deepcopy(self.default_config)
+            print(f"✅ Configuration loaded from {self.config_file}")
+        except FileNotFoundError:
+            # No separate exists() check: the stat in _load_cached_yaml tells us
             print(f"⚠️  Config file {self.config_file} not found. Using defaults.")
-            self._config = self.default_config
+            self._config = copy.deepcopy(self.default_config)
+        except Exception as e:
+            print(f"❌ Error loading config file: {e}. Using defaults.")
+            self._config = copy.deepcopy(self.default_config)
+
+    def _load_cached_yaml(self):
+        """
+        Load parsed YAML, reusing a pickled copy while the file is unchanged
+
+        The cache lives next to the config file and is keyed by the YAML
+        file's mtime and size, so any edit to config.yaml triggers a reparse.
+
+        Returns:
+            dict: Parsed YAML content (or None for an empty file)
+        """
+        st = os.stat(self.config_file)
+        stamp = (st.st_mtime_ns, st.st_size)
+        cache_file = self.config_file + '.cache'
+
+        try:
+            with open(cache_file, 'rb') as f:
+                cached_stamp, cached_config = pickle.load(f)
+            if cached_stamp == stamp:
+                return cached_config
+        except Exception:
+            pass  # Missing or unreadable cache - fall back to YAML
+
+        yaml, loader, _ = _yaml_backend()
+        with open(self.config_file, 'r') as f:
+            loaded_config = yaml.load(f, Loader=loader)
+
+        # Write atomically so a concurrent reader never sees a partial cache
+        try:
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'wb') as f:
+                pickle.dump((stamp, loaded_config), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass  # Read-only directory etc. - caching is best effort
+
+        return loaded_config
 
     def merge_config(self, default, user):
-        """Recursively merge user config with defaults"""
+        """
+        Merge user config over defaults
+
+        Works on a single deep copy of the defaults and walks nested
+        sections with an explicit stack, so only overridden keys are touched.
+        """
         if not isinstance(user, dict):
             return user
 
-        merged = default.copy()
-        for key, value in user.items():
-            if key in merged:
-                if isinstance(merged[key], dict) and isinstance(value, dict):
-                    merged[key] = self.merge_config(merged[key], value)
+        merged = copy.deepcopy(default)
+        stack = [(merged, user)]
+        while stack:
+            target, source = stack.pop()
+            for key, value in source.items():
+                if isinstance(value, dict) and isinstance(target.get(key), dict):
+                    stack.append((target[key], value))
                 else:
-                    merged[key] = value
-            else:
-                merged[key] = value
+                    target[key] = value
         return merged
 
     def get(self, key_path, default=None):
         """Get config value by dot-separated path (e.g., 'monitor.interval_minutes')"""
-        keys = key_path.split('.')
-        value = self._config
-        for key in keys:
-            if isinstance(value, dict) and key in value:
-                value = value[key]
-            else:
-                return default
-        return value
+        value = self._get_cache.get(key_path, _MISSING)
+        if value is _MISSING and key_path not in self._get_cache:
+            # Resolve and store under the lock, so a concurrent set() can't
+            # clear the cache in between and have a stale value put back
+            with self._lock:
+                value = self._config
+                for key in key_path.split('.'):
+                    if isinstance(value, dict) and key in value:
+                        value = value[key]
+                    else:
+                        value = _MISSING
+                        break
+                self._get_cache[key_path] = value
+        return default if value is _MISSING else value
 
     def set(self, key_path, value):
         """Set config value by dot-separated path"""
         keys = key_path.split('.')
-        config = self._config
-        for key in keys[:-1]:
-            if key not in config:
-                config[key] = {}
-            config = config[key]
-        config[keys[-1]] = value
+        with self._lock:
+            config = self._config
+            for key in keys[:-1]:
+                if key not in config:
+                    config[key] = {}
+                config = config[key]
+            config[keys[-1]] = value
+            self._get_cache.clear()
 
     def save_config(self):
         """Save current configuration to file"""
         try:
-            with open(self.config_file, 'w') as f:
-                yaml.dump(self._config, f, default_flow_style=False, indent=2)
+            yaml, _, dumper = _yaml_backend()
+            with self._lock, open(self.config_file, 'w') as f:
+                yaml.dump(self._config, f, Dumper=dumper, default_flow_style=False, indent=2)
             print(f"✅ Configuration saved to {self.config_file}")
         except Exception as e:
             print(f"❌ Error saving config file: {e}")
 
 
-# Global instance
-config_manager = ConfigManager()
-
-
 # Convenience functions
 def get_config(key_path, default=None):
-    return config_manager.get(key_path, default)
+    return ConfigManager.get_instance().get(key_path, default)
 
 
 def set_config(key_path, value):
-    return config_manager.set(key_path, value)
+    return ConfigManager.get_instance().set(key_path, value)
 
 
 def save_config():
-    return config_manager.save_config()
\ No newline at end of file
+    return ConfigManager.get_instance().save_config()
@@ -9,11 +9,46 @@ import sys
 import signal
 import time
 import subprocess
-import psutil
 from pathlib import Path
 from logger_manager import logger
 
 
+def _pid_alive(pid):
+    """
+    Check whether a process with the given PID exists
+
+    Uses a single syscall (kill with signal 0 / OpenProcess) instead of
+    building a full psutil.Process object.
+
+    Args:
+        pid: Process ID
+
+    Returns:
+        bool: True if the process exists
+    """
+    if not pid or pid < 0:
+        return False
+
+    if os.name == 'nt':
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        SYNCHRONIZE = 0x00100000
+        handle = kernel32.OpenProcess(SYNCHRONIZE, False, pid)
+        if not handle:
+            return False
+        kernel32.CloseHandle(handle)
+        return True
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Process exists but belongs to another user
+        return True
+    return True
+
+
 class DaemonManager:
     """
     Manages daemon/background process for TikTok Monitor
@@ -28,6 +63,7 @@ class DaemonManager:
             pid_file: Path to PID file (default: ./tiktok-monitor.pid)
         """
         self.pid_file = Path(pid_file)
+        self._proc = None  # Cached psutil.Process for non-blocking CPU readings
         
     def start_daemon(self, args):
         """
@@ -53,65 +89,34 @@ class DaemonManager:
         
         try:
             if os.name == 'nt':  # Windows
-                # Windows: Use subprocess with detached process
-                creationflags = subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS
-                process = subprocess.Popen(
-                    cmd,
-                    creationflags=creationflags,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                    stdin=subprocess.DEVNULL,
-                    close_fds=True
-                )
-                pid = process.pid
-                
+                # Detached process in its own process group
+                detach = {
+                    'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS
+                }
+                log_hint = "logs\\tiktok_monitor.log"
             else:  # Unix (Linux, macOS)
-                # Fork process to create daemon
-                pid = os.fork()
-                
-                if pid > 0:
-                    # Parent process
-                    time.sleep(0.5)  # Give child time to start
-                    self.write_pid(pid)
-                    print(f"✅ Daemon started successfully!")
-                    print(f"   PID: {pid}")
-                    print(f"   Check logs: tail -f logs/tiktok_monitor_*.log")
-                    print(f"   Status: python tiktok_monitor.py --status")
-                    print(f"   Stop: python tiktok_monitor.py --stop")
-                    return pid
-                else:
-                    # Child process - become daemon
-                    # Detach from parent
-                    os.setsid()
-                    
-                    # Second fork to prevent zombie
-                    pid = os.fork()
-                    if pid > 0:
-                        sys.exit(0)
-                    
-                    # Redirect standard file descriptors
-                    sys.stdout.flush()
-                    sys.stderr.flush()
-                    
-                    # Close stdin/stdout/stderr
-                    with open(os.devnull, 'r') as f:
-                        os.dup2(f.fileno(), sys.stdin.fileno())
-                    with open(os.devnull, 'a+') as f:
-                        os.dup2(f.fileno(), sys.stdout.fileno())
-                        os.dup2(f.fileno(), sys.stderr.fileno())
-                    
-                    # Write PID
-                    self.write_pid(os.getpid())
-                    
-                    # Execute the actual monitoring
-                    # This happens in the child process
-                    return None  # Child doesn't return
+                # New session detaches from the controlling terminal; Popen
+                # spawns without duplicating this interpreter the way a
+                # manual fork/setsid/fork sequence does
+                detach = {'start_new_session': True}
+                log_hint = "tail -f logs/tiktok_monitor.log"
             
-            # Windows continues here
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                stdin=subprocess.DEVNULL,
+                close_fds=True,
+                **detach
+            )
+            pid = process.pid
+            
+            # No CPU baseline here: this CLI process exits right away, and
+            # get_status() starts one on its first call
             self.write_pid(pid)
             print(f"✅ Daemon started successfully!")
             print(f"   PID: {pid}")
-            print(f"   Check logs: logs\\tiktok_monitor_*.log")
+            print(f"   Check logs: {log_hint}")
             print(f"   Status: python tiktok_monitor.py --status")
             print(f"   Stop: python tiktok_monitor.py --stop")
             return pid
@@ -135,6 +140,8 @@ class DaemonManager:
         pid = self.read_pid()
         print(f"⏹️  Stopping daemon (PID {pid})...")
         
+        import psutil  # Deferred: only needed to stop/inspect the daemon
+        
         try:
             process = psutil.Process(pid)
             
@@ -145,18 +152,14 @@ class DaemonManager:
                 os.kill(pid, signal.SIGTERM)
             
             # Wait up to 10 seconds for process to stop
-            for i in range(10):
-                if not process.is_running():
-                    break
-                time.sleep(1)
-                if i == 0:
-                    print("   Waiting for graceful shutdown...")
-            
-            # If still running, force kill
-            if process.is_running():
+            print("   Waiting for graceful shutdown...")
+            try:
+                process.wait(timeout=10)
+            except psutil.TimeoutExpired:
+                # Still running, force kill
                 print("   Force killing process...")
                 process.kill()
-                time.sleep(1)
+                process.wait(timeout=2)
             
             # Remove PID file
             self.remove_pid()
@@ -188,14 +191,30 @@ class DaemonManager:
         
         pid = self.read_pid()
         
+        if not _pid_alive(pid):
+            # PID file exists but process doesn't
+            self.remove_pid()
+            return {
+                'running': False,
+                'message': '🔴 Daemon is NOT running (stale PID file removed)'
+            }
+        
+        import psutil  # Deferred: only needed for process details
+        
         try:
-            process = psutil.Process(pid)
+            if self._proc is not None and self._proc.pid == pid:
+                process = self._proc
+                # Non-blocking: CPU usage since the previous reading
+                cpu_percent = process.cpu_percent(interval=None)
+            else:
+                # First reading only sets the baseline
+                process = self._track_process(pid)
+                cpu_percent = None
             
             if process.is_running():
                 # Get process info
                 create_time = time.strftime('%Y-%m-%d %H:%M:%S', 
                                           time.localtime(process.create_time()))
-                cpu_percent = process.cpu_percent(interval=0.1)
                 memory_mb = process.memory_info().rss / 1024 / 1024
                 
                 return {
@@ -222,6 +241,19 @@ class DaemonManager:
                 'message': '🔴 Daemon is NOT running (stale PID file removed)'
             }
     
+    def _track_process(self, pid):
+        """
+        Cache a psutil.Process for pid and start its CPU usage baseline
+        
+        Returns:
+            psutil.Process: The cached process
+        """
+        import psutil
+        
+        self._proc = psutil.Process(pid)
+        self._proc.cpu_percent(interval=None)
+        return self._proc
+    
     def is_running(self):
         """
         Check if daemon is currently running
@@ -232,18 +264,17 @@ class DaemonManager:
         if not self.pid_file.exists():
             return False
         
-        pid = self.read_pid()
-        
-        try:
-            process = psutil.Process(pid)
-            return process.is_running()
-        except (psutil.NoSuchProcess, ValueError):
-            return False
+        return _pid_alive(self.read_pid())
     
     def write_pid(self, pid):
-        """Write PID to file"""
+        """Write PID to file atomically (temp file + rename)"""
         try:
-            self.pid_file.write_text(str(pid))
+            tmp_file = self.pid_file.with_name(self.pid_file.name + '.tmp')
+            with open(tmp_file, 'w') as f:
+                f.write(str(pid))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.pid_file)
             logger.debug(f"PID file written: {self.pid_file}")
         except Exception as e:
             logger.error(f"Failed to write PID file: {e}")
@@ -4,8 +4,17 @@ Error Handler - User-Friendly Error Messages
 Translates technical errors into clear messages with practical solutions
 """
 
+import sys
+from functools import lru_cache
 from logger_manager import logger
 
+# Optional Aho-Corasick matcher for single-pass keyword classification
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 
 class ErrorType:
     """Error categorization"""
@@ -21,12 +30,92 @@ class ErrorType:
     UNKNOWN = "unknown"
 
 
+# Lowercase keywords per error type, in priority order (first matching type wins).
+# Built once at import and shared by both matchers.
+ERROR_KEYWORDS = (
+    (ErrorType.GEO_RESTRICTION, ('geo', 'not available in your', 'region', 'country')),
+    (ErrorType.PRIVATE_VIDEO, ('private', 'unavailable', 'this video is private')),
+    (ErrorType.DELETED_VIDEO, ('removed', 'deleted', 'no longer available', 'not found', '404')),
+    (ErrorType.RATE_LIMIT, ('rate limit', '429', 'too many requests', 'slow down')),
+    (ErrorType.NETWORK, ('connection', 'timeout', 'timed out', 'network', 'unreachable', 'no internet')),
+    (ErrorType.INVALID_URL, ('invalid url', 'malformed', 'unsupported url')),
+    (ErrorType.PERMISSION, ('permission', 'access denied', 'forbidden', '403')),
+    (ErrorType.DISK_SPACE, ('disk', 'space', 'no space left', 'storage')),
+    (ErrorType.COOKIES_NEEDED, (
+        'sign in', 'login', 'authentication', 'unauthorized',
+        'requiring login', 'cookies', 'unable to extract',
+        'user id', 'channel_id', '--cookies'
+    )),
+)
+
+
+def _build_automaton():
+    """Compile all keywords into one automaton mapping keyword -> priority"""
+    automaton = ahocorasick.Automaton()
+    for priority, (_, keywords) in enumerate(ERROR_KEYWORDS):
+        for keyword in keywords:
+            # A keyword shared by several types keeps its highest priority
+            if automaton.get(keyword, priority) >= priority:
+                automaton.add_word(keyword, priority)
+    automaton.make_automaton()
+    return automaton
+
+
+_AUTOMATON = _build_automaton() if AHOCORASICK_AVAILABLE else None
+
+# Fallback when ahocorasick is missing: every (keyword, priority) pair in
+# priority order, so the first keyword found is the best match. Plain str
+# `in` on the ASCII messages beats both a regex alternation and bytes.find
+# (encoding the message costs more than the 1-byte-per-char scan saves).
+_KEYWORD_TABLE = tuple(
+    (keyword, priority)
+    for priority, (_, keywords) in enumerate(ERROR_KEYWORDS)
+    for keyword in keywords
+)
+
+
+def _match_priorities(error_msg):
+    """Yield the priority of every keyword occurrence in error_msg"""
+    if _AUTOMATON is not None:
+        for _, priority in _AUTOMATON.iter(error_msg):
+            yield priority
+    else:
+        for keyword, priority in _KEYWORD_TABLE:
+            if keyword in error_msg:
+                yield priority
+                return
+
+
+@lru_cache(maxsize=256)
+def classify_error_message(error_msg):
+    """
+    Classify an error message into an ErrorType
+
+    Results are memoized on the raw message: retries of the same failing
+    URL usually produce the identical string, so repeats skip both the
+    lowercasing and the keyword scan.
+
+    Args:
+        error_msg: Error message, as str(exception)
+
+    Returns:
+        str: Matching ErrorType (ErrorType.UNKNOWN if nothing matches)
+    """
+    best = min(_match_priorities(error_msg.lower()), default=None)
+    return ErrorType.UNKNOWN if best is None else ERROR_KEYWORDS[best][0]
+
+
 class UserFriendlyError(Exception):
     """Error with user-friendly message"""
+
+    # Slots keep the fields out of the (lazily created) exception __dict__
+    __slots__ = ('error_type', 'message', 'solutions', 'technical_details')
+
     def __init__(self, error_type, message, solutions=None, technical_details=None):
         self.error_type = error_type
         self.message = message
-        self.solutions = solutions or []
+        # tuple() of a tuple returns the same object, so shared templates aren't copied
+        self.solutions = tuple(solutions) if solutions else ()
         self.technical_details = technical_details
         super().__init__(message)
 
@@ -50,154 +139,143 @@ class ErrorHandler:
         ErrorType.UNKNOWN: "❌"
     }
     
-    @staticmethod
-    def analyze_error(exception):
-        """
-        Analyze an exception and return a user-friendly error
-        
-        Args:
-            exception: The original exception
-            
-        Returns:
-            UserFriendlyError: Error with clear message and solutions
-        """
-        error_msg = str(exception).lower()
-        
-        # Geo-restriction detection
-        if any(keyword in error_msg for keyword in ['geo', 'not available in your', 'region', 'country']):
-            return UserFriendlyError(
-                ErrorType.GEO_RESTRICTION,
-                "Video not available in your region",
-                solutions=[
-                    "Connect to a VPN (recommended: USA, Canada, or Germany)",
-                    "Export cookies from TikTok website (run: python tiktok_downloader_advanced.py --help-cookies)",
-                    "Try again later (sometimes temporary restriction)"
-                ],
-                technical_details=str(exception)
+    # Retryable errors (temporary issues only)
+    RETRYABLE_TYPES = frozenset((
+        ErrorType.NETWORK,
+        ErrorType.RATE_LIMIT
+        # ← UNKNOWN REMOVED - don't retry unknown errors!
+    ))
+
+    # Non-retryable errors (require user action)
+    NON_RETRYABLE_TYPES = frozenset((
+        ErrorType.DELETED_VIDEO,
+        ErrorType.PRIVATE_VIDEO,
+        ErrorType.INVALID_URL,
+        ErrorType.DISK_SPACE,
+        ErrorType.GEO_RESTRICTION,
+        ErrorType.COOKIES_NEEDED,
+        ErrorType.PERMISSION,
+        ErrorType.UNKNOWN
+    ))
+
+    # Recommended wait before retry, in seconds
+    RETRY_WAIT_TIMES = {
+        ErrorType.RATE_LIMIT: 300,  # 5 minutes
+        ErrorType.NETWORK: 30,
+        ErrorType.GEO_RESTRICTION: 60,
+        ErrorType.UNKNOWN: 45
+    }
+    
+    # Message and solutions shown for each error type (shared, immutable tuples)
+    ERROR_TEMPLATES = {
+        ErrorType.GEO_RESTRICTION: (
+            "Video not available in your region",
+            (
+                "Connect to a VPN (recommended: USA, Canada, or Germany)",
+                "Export cookies from TikTok website (run: python tiktok_downloader_advanced.py --help-cookies)",
+                "Try again later (sometimes temporary restriction)"
             )
-        
-        # Private video
-        if any(keyword in error_msg for keyword in ['private', 'unavailable', 'this video is private']):
-            return UserFriendlyError(
-                ErrorType.PRIVATE_VIDEO,
-                "This video is private or unavailable",
-                solutions=[
-                    "The video might be set to 'Friends only' or 'Private'",
-                    "Check if you need to be logged in to view it",
-                    "Export cookies from your TikTok account (run: python tiktok_downloader_advanced.py --help-cookies)"
-                ],
-                technical_details=str(exception)
+        ),
+        ErrorType.PRIVATE_VIDEO: (
+            "This video is private or unavailable",
+            (
+                "The video might be set to 'Friends only' or 'Private'",
+                "Check if you need to be logged in to view it",
+                "Export cookies from your TikTok account (run: python tiktok_downloader_advanced.py --help-cookies)"
             )
-        
-        # Deleted/removed video
-        if any(keyword in error_msg for keyword in ['removed', 'deleted', 'no longer available', 'not found', '404']):
-            return UserFriendlyError(
-                ErrorType.DELETED_VIDEO,
-                "Video has been deleted or removed",
-                solutions=[
-                    "The author may have deleted the video",
-                    "The video might have been removed for violating TikTok guidelines",
-                    "Check if the URL is correct"
-                ],
-                technical_details=str(exception)
+        ),
+        ErrorType.DELETED_VIDEO: (
+            "Video has been deleted or removed",
+            (
+                "The author may have deleted the video",
+                "The video might have been removed for violating TikTok guidelines",
+                "Check if the URL is correct"
             )
-        
-        # Rate limiting
-        if any(keyword in error_msg for keyword in ['rate limit', '429', 'too many requests', 'slow down']):
-            return UserFriendlyError(
-                ErrorType.RATE_LIMIT,
-                "Too many requests - TikTok is limiting downloads",
-                solutions=[
-                    "Wait 5-10 minutes before trying again",
-                    "Use a VPN to change your IP address",
-                    "Reduce check frequency in config.yaml (increase interval_minutes)",
-                    "The monitor will automatically retry with longer delays"
-                ],
-                technical_details=str(exception)
+        ),
+        ErrorType.RATE_LIMIT: (
+            "Too many requests - TikTok is limiting downloads",
+            (
+                "Wait 5-10 minutes before trying again",
+                "Use a VPN to change your IP address",
+                "Reduce check frequency in config.yaml (increase interval_minutes)",
+                "The monitor will automatically retry with longer delays"
             )
-        
-        # Network errors
-        if any(keyword in error_msg for keyword in ['connection', 'timeout', 'timed out', 'network', 'unreachable', 'no internet']):
-            return UserFriendlyError(
-                ErrorType.NETWORK,
-                "Network connection problem",
-                solutions=[
-                    "Check your internet connection",
-                    "Try again in a few moments",
-                    "Check if TikTok is accessible in your browser",
-                    "The monitor will automatically retry"
-                ],
-                technical_details=str(exception)
+        ),
+        ErrorType.NETWORK: (
+            "Network connection problem",
+            (
+                "Check your internet connection",
+                "Try again in a few moments",
+                "Check if TikTok is accessible in your browser",
+                "The monitor will automatically retry"
             )
-        
-        # Invalid URL
-        if any(keyword in error_msg for keyword in ['invalid url', 'malformed', 'unsupported url']):
-            return UserFriendlyError(
-                ErrorType.INVALID_URL,
-                "Invalid TikTok URL",
-                solutions=[
-                    "Make sure the URL starts with: https://www.tiktok.com/@username/video/",
-                    "Copy the URL directly from TikTok app or website",
-                    "Example: https://www.tiktok.com/@charlidamelio/video/1234567890"
-                ],
-                technical_details=str(exception)
+        ),
+        ErrorType.INVALID_URL: (
+            "Invalid TikTok URL",
+            (
+                "Make sure the URL starts with: https://www.tiktok.com/@username/video/",
+                "Copy the URL directly from TikTok app or website",
+                "Example: https://www.tiktok.com/@charlidamelio/video/1234567890"
             )
-        
-        # Permission errors
-        if any(keyword in error_msg for keyword in ['permission', 'access denied', 'forbidden', '403']):
-            return UserFriendlyError(
-                ErrorType.PERMISSION,
-                "Access denied - permission required",
-                solutions=[
-                    "You might need to be logged in to view this content",
-                    "Export cookies from TikTok (run: python tiktok_downloader_advanced.py --help-cookies)",
-                    "Check if the video requires special permissions (age restriction, etc.)"
-                ],
-                technical_details=str(exception)
+        ),
+        ErrorType.PERMISSION: (
+            "Access denied - permission required",
+            (
+                "You might need to be logged in to view this content",
+                "Export cookies from TikTok (run: python tiktok_downloader_advanced.py --help-cookies)",
+                "Check if the video requires special permissions (age restriction, etc.)"
             )
-        
-        # Disk space
-        if any(keyword in error_msg for keyword in ['disk', 'space', 'no space left', 'storage']):
-            return UserFriendlyError(
-                ErrorType.DISK_SPACE,
-                "Not enough disk space",
-                solutions=[
-                    "Free up space on your hard drive",
-                    "Change output directory to a drive with more space",
-                    "Delete old downloaded videos you no longer need"
-                ],
-                technical_details=str(exception)
+        ),
+        ErrorType.DISK_SPACE: (
+            "Not enough disk space",
+            (
+                "Free up space on your hard drive",
+                "Change output directory to a drive with more space",
+                "Delete old downloaded videos you no longer need"
             )
-
-        # Cookies needed (generic authentication issue)
-        if any(keyword in error_msg for keyword in [
-            'sign in', 'login', 'authentication', 'unauthorized',
-            'requiring login', 'cookies', 'unable to extract',
-            'user id', 'channel_id', '--cookies'
-        ]):
-            return UserFriendlyError(
-                ErrorType.COOKIES_NEEDED,
-                "Authentication required",
-                solutions=[
-                    "This video requires you to be logged in",
-                    "Export cookies from your TikTok account",
-                    "Run: python tiktok_downloader_advanced.py --help-cookies",
-                    "Follow the instructions to export cookies from your browser"
-                ],
-                technical_details=str(exception)
+        ),
+        ErrorType.COOKIES_NEEDED: (
+            "Authentication required",
+            (
+                "This video requires you to be logged in",
+                "Export cookies from your TikTok account",
+                "Run: python tiktok_downloader_advanced.py --help-cookies",
+                "Follow the instructions to export cookies from your browser"
             )
-        
-        # Unknown error
-        return UserFriendlyError(
-            ErrorType.UNKNOWN,
+        ),
+        ErrorType.UNKNOWN: (
             "An unexpected error occurred",
-            solutions=[
+            (
                 "Try again in a few moments",
                 "Check if the video URL is correct",
                 "Make sure you have the latest version of yt-dlp: pip install --upgrade yt-dlp",
                 "Report this error on GitHub if it persists: https://github.com/gabrielrahbar/TikTokAutoDownloader/issues"
-            ],
-            technical_details=str(exception)
+            )
+        )
+    }
+    
+    @staticmethod
+    def analyze_error(exception):
+        """
+        Analyze an exception and return a user-friendly error
+        
+        Args:
+            exception: The original exception
+            
+        Returns:
+            UserFriendlyError: Error with clear message and solutions
+        """
+        details = str(exception)
+        # Only the classification is cached: each call still gets its own
+        # error object carrying this failure's technical details
+        error_type = classify_error_message(details)
+        message, solutions = ErrorHandler.ERROR_TEMPLATES[error_type]
+
+        return UserFriendlyError(
+            error_type,
+            message,
+            solutions=solutions,
+            technical_details=details
         )
     
     @staticmethod
@@ -211,23 +289,22 @@ class ErrorHandler:
         """
         emoji = ErrorHandler.ERROR_EMOJI.get(error.error_type, "❌")
         
-        # Print header
-        print("\n" + "="*70)
-        print(f"{emoji} ERROR: {error.message}")
-        print("="*70)
+        # Build the whole banner and write it at once
+        lines = ["", "=" * 70, f"{emoji} ERROR: {error.message}", "=" * 70]
         
-        # Print solutions
+        # Solutions
         if error.solutions:
-            print("\n💡 SOLUTIONS:")
-            for i, solution in enumerate(error.solutions, 1):
-                print(f"   {i}. {solution}")
+            lines.append("\n💡 SOLUTIONS:")
+            lines.extend(f"   {i}. {solution}" for i, solution in enumerate(error.solutions, 1))
         
-        # Print technical details (optional)
+        # Technical details (optional)
         if show_technical and error.technical_details:
-            print("\n🔧 Technical details:")
-            print(f"   {error.technical_details}")
+            lines.append("\n🔧 Technical details:")
+            lines.append(f"   {error.technical_details}")
         
-        print("="*70 + "\n")
+        lines.extend(["=" * 70, ""])
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
     
     @staticmethod
     def handle_download_error(exception, url, username=None, show_technical=False):
@@ -266,29 +343,10 @@ class ErrorHandler:
         Returns:
             bool: True if should retry, False otherwise
         """
-        # Retryable errors (temporary issues only)
-        retryable_types = [
-            ErrorType.NETWORK,
-            ErrorType.RATE_LIMIT
-            # ← UNKNOWN REMOVED - don't retry unknown errors!
-        ]
-
-        # Non-retryable errors (require user action)
-        non_retryable_types = [
-            ErrorType.DELETED_VIDEO,
-            ErrorType.PRIVATE_VIDEO,
-            ErrorType.INVALID_URL,
-            ErrorType.DISK_SPACE,
-            ErrorType.GEO_RESTRICTION,
-            ErrorType.COOKIES_NEEDED,
-            ErrorType.PERMISSION,
-            ErrorType.UNKNOWN
-        ]
-
-        if error.error_type in non_retryable_types:
+        if error.error_type in ErrorHandler.NON_RETRYABLE_TYPES:
             return False
 
-        if error.error_type in retryable_types:
+        if error.error_type in ErrorHandler.RETRYABLE_TYPES:
             return True
 
         # Default: don't retry
@@ -307,14 +365,7 @@ class ErrorHandler:
         Returns:
             int: Seconds to wait before retry
         """
-        wait_times = {
-            ErrorType.RATE_LIMIT: 300,  # 5 minutes
-            ErrorType.NETWORK: 30,
-            ErrorType.GEO_RESTRICTION: 60,
-            ErrorType.UNKNOWN: 45
-        }
-        
-        return wait_times.get(error.error_type, 30)
+        return ErrorHandler.RETRY_WAIT_TIMES.get(error.error_type, 30)
 
 
 # Convenience functions
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Formatting helpers shared by notifications and the downloader
+"""
+
+# (threshold, divisor, suffix, decimals), largest first
+_SCALES = (
+    (1_000_000_000, 1e9, 'B', 1),
+    (1_000_000, 1e6, 'M', 1),
+    (1_000, 1e3, 'K', 0),
+)
+
+
+def format_count(n):
+    """
+    Format a view/like count compactly (1.2M, 450K, 999)
+    
+    Args:
+        n (int): Count to format
+        
+    Returns:
+        str: Formatted count
+    """
+    for threshold, divisor, suffix, decimals in _SCALES:
+        if n >= threshold:
+            return f"{n / divisor:.{decimals}f}{suffix}"
+    return str(n)
@@ -4,12 +4,37 @@ Logger Manager for TikTok Auto Downloader
 Provides structured logging with file and console output
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import threading
+import time
 from pathlib import Path
 
 
+class _FastFormatter(logging.Formatter):
+    """
+    Formatter that renders the timestamp at most once per second
+
+    Records logged within the same second reuse the cached asctime string.
+    The second and its string are kept as one tuple, so handlers on other
+    threads sharing this formatter never see one without the other.
+    """
+    
+    _last = (None, '')
+    
+    def formatTime(self, record, datefmt=None):
+        t = int(record.created)
+        last_t, last_s = self._last
+        if t != last_t:
+            datefmt = datefmt or self.datefmt or '%Y-%m-%d %H:%M:%S'
+            last_s = time.strftime(datefmt, self.converter(t))
+            self._last = (t, last_s)
+        return last_s
+
+
 class LoggerManager:
     """
     Centralized logger configuration for the entire application
@@ -18,17 +43,20 @@ class LoggerManager:
     _instance = None
     _logger = None
     
-    def __new__(cls):
+    def __new__(cls, log_dir="logs", log_level=logging.INFO):
+        # Handlers are configured once, when the shared instance is created;
+        # there is no __init__, so later LoggerManager() calls do no work
         if cls._instance is None:
-            cls._instance = super(LoggerManager, cls).__new__(cls)
+            instance = super(LoggerManager, cls).__new__(cls)
+            instance._setup(log_dir, log_level)
+            cls._instance = instance
         return cls._instance
     
-    def __init__(self, log_dir="logs", log_level=logging.INFO):
-        if self._logger is not None:
-            return
-            
+    def _setup(self, log_dir, log_level):
+        """Create the log directory and attach the queued handlers"""
         self.log_dir = Path(log_dir)
-        self.log_dir.mkdir(parents=True, exist_ok=True)
+        if not os.path.isdir(log_dir):  # Usually exists after the first run
+            os.makedirs(log_dir, exist_ok=True)
         
         # Create logger
         self._logger = logging.getLogger("TikTokMonitor")
@@ -38,11 +66,14 @@ class LoggerManager:
         if self._logger.handlers:
             return
         
-        # File handler - daily rotation
-        log_filename = f"tiktok_monitor_{datetime.now().strftime('%Y-%m-%d')}.log"
-        log_filepath = self.log_dir / log_filename
+        # File handler - rotated at midnight, last 7 days kept; the file is
+        # only opened once the first record is written
+        log_filepath = self.log_dir / "tiktok_monitor.log"
         
-        file_handler = logging.FileHandler(log_filepath, encoding='utf-8')
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            log_filepath, when='midnight', backupCount=7,
+            encoding='utf-8', delay=True
+        )
         file_handler.setLevel(logging.DEBUG)
         
         # Console handler
@@ -50,7 +81,7 @@ class LoggerManager:
         console_handler.setLevel(log_level)
         
         # Formatter
-        formatter = logging.Formatter(
+        formatter = _FastFormatter(
             '%(asctime)s | %(levelname)-8s | %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
@@ -58,91 +89,125 @@ class LoggerManager:
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
         
-        # Add handlers
-        self._logger.addHandler(file_handler)
+        # Batch file writes; errors and the periodic flusher push them out early
+        self._buffered = logging.handlers.MemoryHandler(
+            capacity=256, flushLevel=logging.ERROR,
+            target=file_handler, flushOnClose=True
+        )
+        self._buffered.setLevel(logging.DEBUG)
+        
+        # The console handler writes synchronously, so log lines stay in order
+        # with print()/input() in the interactive menu; file records are only
+        # enqueued and a background listener does those writes
         self._logger.addHandler(console_handler)
+        self._log_queue = queue.Queue(-1)
+        self._logger.addHandler(logging.handlers.QueueHandler(self._log_queue))
+        self._listener = logging.handlers.QueueListener(
+            self._log_queue, self._buffered, respect_handler_level=True
+        )
+        self._listener.start()
+        
+        self._flush_stop = threading.Event()
+        threading.Thread(
+            target=self._flush_periodically, name="LogFlusher", daemon=True
+        ).start()
+        atexit.register(self._shutdown)
         
         self._logger.info("=" * 60)
         self._logger.info("TikTok Monitor Started")
-        self._logger.info(f"Log file: {log_filepath}")
+        self._logger.info("Log file: %s", log_filepath)
         self._logger.info("=" * 60)
     
+    def _flush_periodically(self, interval=2.0):
+        """Flush buffered file records every interval seconds"""
+        while not self._flush_stop.wait(interval):
+            self._buffered.flush()
+    
+    def _shutdown(self):
+        """Drain queued records and write out the file buffer"""
+        self._listener.stop()
+        self._flush_stop.set()
+        self._buffered.flush()
+    
     @property
     def logger(self):
         return self._logger
     
-    def debug(self, message):
+    # Extra args are %-formatted by logging only if the record is emitted
+    def debug(self, message, *args):
         """Log debug message"""
-        self._logger.debug(message)
+        self._logger.debug(message, *args)
     
-    def info(self, message):
+    def info(self, message, *args):
         """Log info message"""
-        self._logger.info(message)
+        self._logger.info(message, *args)
     
-    def warning(self, message):
+    def warning(self, message, *args):
         """Log warning message"""
-        self._logger.warning(message)
+        self._logger.warning(message, *args)
     
-    def error(self, message, exc_info=False):
+    def error(self, message, *args, exc_info=False):
         """Log error message"""
-        self._logger.error(message, exc_info=exc_info)
+        self._logger.error(message, *args, exc_info=exc_info)
     
-    def critical(self, message, exc_info=False):
+    def critical(self, message, *args, exc_info=False):
         """Log critical message"""
-        self._logger.critical(message, exc_info=exc_info)
+        self._logger.critical(message, *args, exc_info=exc_info)
     
     def success(self, message):
         """Log success message (as INFO level)"""
-        self._logger.info(f"✅ {message}")
+        self._logger.info("✅ %s", message)
     
     def download_start(self, url, user):
         """Log download start"""
-        self._logger.info(f"📥 Starting download: @{user}")
-        self._logger.debug(f"URL: {url}")
+        self._logger.info("📥 Starting download: @%s", user)
+        self._logger.debug("URL: %s", url)
     
     def download_complete(self, filepath, user):
         """Log download completion"""
-        self._logger.info(f"✅ Download complete: @{user}")
-        self._logger.debug(f"File: {filepath}")
+        self._logger.info("✅ Download complete: @%s", user)
+        self._logger.debug("File: %s", filepath)
     
     def download_failed(self, url, user, error):
         """Log download failure"""
-        self._logger.error(f"❌ Download failed: @{user}")
-        self._logger.error(f"Error: {error}")
-        self._logger.debug(f"URL: {url}")
+        self._logger.error("❌ Download failed: @%s", user)
+        self._logger.error("Error: %s", error)
+        self._logger.debug("URL: %s", url)
     
     def retry_attempt(self, attempt, max_attempts, wait_time):
         """Log retry attempt"""
         self._logger.warning(
-            f"🔄 Retry attempt {attempt}/{max_attempts} in {wait_time}s..."
+            "🔄 Retry attempt %s/%s in %ss...", attempt, max_attempts, wait_time
         )
     
     def monitoring_start(self, users, interval):
         """Log monitoring start"""
+        if not self._logger.isEnabledFor(logging.INFO):
+            return
         self._logger.info("=" * 60)
         self._logger.info("🚀 Starting automatic monitoring")
         self._logger.info(f"👥 Users: {', '.join('@' + u for u in users)}")
-        self._logger.info(f"⏱️  Interval: {interval} minutes")
+        self._logger.info("⏱️  Interval: %s minutes", interval)
         self._logger.info("=" * 60)
     
     def monitoring_check(self, iteration, user):
         """Log monitoring check"""
-        self._logger.info(f"🔍 Check #{iteration}: @{user}")
+        self._logger.info("🔍 Check #%s: @%s", iteration, user)
     
     def new_videos_found(self, count, user):
         """Log new videos found"""
         if count > 0:
-            self._logger.info(f"🆕 Found {count} new video(s) for @{user}")
+            self._logger.info("🆕 Found %s new video(s) for @%s", count, user)
         else:
-            self._logger.debug(f"No new videos for @{user}")
+            self._logger.debug("No new videos for @%s", user)
     
     def user_added(self, username):
         """Log user added to monitoring"""
-        self._logger.info(f"➕ User added to monitoring: @{username}")
+        self._logger.info("➕ User added to monitoring: @%s", username)
     
     def user_removed(self, username):
         """Log user removed from monitoring"""
-        self._logger.info(f"❌ User removed from monitoring: @{username}")
+        self._logger.info("❌ User removed from monitoring: @%s", username)
     
     def geo_restriction_detected(self):
         """Log geo-restriction detection"""
@@ -151,17 +216,25 @@ class LoggerManager:
     
     def rate_limit_detected(self, wait_time):
         """Log rate limiting"""
-        self._logger.warning(f"⏳ Rate limit detected. Waiting {wait_time}s...")
+        self._logger.warning("⏳ Rate limit detected. Waiting %ss...", wait_time)
     
     def cleanup_old_logs(self, days=7):
-        """Remove log files older than specified days"""
+        """
+        Remove *.log files older than specified days
+
+        Rotated backups are pruned by the file handler (backupCount=7); this
+        sweeps leftovers such as the old per-day tiktok_monitor_<date>.log files.
+        """
         try:
-            current_time = datetime.now()
-            for log_file in self.log_dir.glob("*.log"):
-                file_time = datetime.fromtimestamp(log_file.stat().st_mtime)
-                if (current_time - file_time).days > days:
-                    log_file.unlink()
-                    self._logger.debug(f"Deleted old log: {log_file.name}")
+            self._buffered.flush()
+            cutoff = time.time() - days * 86400
+            with os.scandir(self.log_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith('.log') or entry.name == "tiktok_monitor.log":
+                        continue
+                    if entry.stat(follow_symlinks=False).st_mtime < cutoff:
+                        os.unlink(entry.path)
+                        self._logger.debug("Deleted old log: %s", entry.name)
         except Exception as e:
             self._logger.error(f"Error cleaning up logs: {e}")
 
@@ -170,26 +243,10 @@ class LoggerManager:
 logger = LoggerManager()
 
 
-# Convenience functions for direct import
-def debug(message):
-    logger.debug(message)
-
-
-def info(message):
-    logger.info(message)
-
-
-def warning(message):
-    logger.warning(message)
-
-
-def error(message, exc_info=False):
-    logger.error(message, exc_info=exc_info)
-
-
-def critical(message, exc_info=False):
-    logger.critical(message, exc_info=exc_info)
-
-
-def success(message):
-    logger.success(message)
+# Convenience functions for direct import (bound once, no extra call frame)
+debug = logger.debug
+info = logger.info
+warning = logger.warning
+error = logger.error
+critical = logger.critical
+success = logger.success
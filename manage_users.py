@@ -5,8 +5,6 @@ Quick management of monitored users
 
 import argparse
 import sys
-from datetime import datetime
-from tiktok_monitor import TikTokMonitor
 
 def main():
     parser = argparse.ArgumentParser(
@@ -49,45 +47,59 @@ Examples:
     
     args = parser.parse_args()
     
-    monitor = TikTokMonitor()
-    
     if args.list:
-        users = monitor.list_monitored_users(show_disabled=args.all)
+        # Read-only query: no monitor, so no yt-dlp import or logger setup
+        from users_db import list_monitored_users_readonly
+        users = list_monitored_users_readonly(show_disabled=args.all)
         
         if not users:
             print("📋 No monitored users")
             return
         
-        print(f"\n{'='*80}")
-        print(f"{'Username':<20} {'Status':<12} {'Last Check':<20} {'Total Videos':<10} {'In DB':<10}")
-        print(f"{'='*80}")
+        rule = '=' * 80
+        rows = [
+            "",
+            rule,
+            f"{'Username':<20} {'Status':<12} {'Last Check':<20} {'Total Videos':<10} {'In DB':<10}",
+            rule,
+        ]
         
-        for username, last_check, total, enabled, db_videos in users:
+        for username, last_check, total, enabled, _last_video_ts, db_videos in users:
             status = "🟢 Active" if enabled else "🔴 Disabled"
-            last_check_str = datetime.fromisoformat(last_check).strftime('%Y-%m-%d %H:%M') if last_check else 'Never'
-            print(f"@{username:<19} {status:<12} {last_check_str:<20} {total:<13} {db_videos:<10}")
+            # last_check is stored as an ISO timestamp: YYYY-MM-DDTHH:MM:SS...
+            if last_check and len(last_check) >= 16:
+                last_check_str = last_check[:10] + ' ' + last_check[11:16]
+            else:
+                last_check_str = 'Never'
+            rows.append(f"@{username:<19} {status:<12} {last_check_str:<20} {total:<13} {db_videos:<10}")
         
-        print(f"{'='*80}")
-        print(f"Total: {len(users)} users")
+        rows.append(rule)
+        rows.append(f"Total: {len(users)} users")
+        sys.stdout.write('\n'.join(rows) + '\n')
+        return
+    
+    if not (args.add or args.remove or args.delete or args.enable):
+        parser.print_help()
+        return
+    
+    # Imported here: only the commands that change users need a full monitor
+    from tiktok_monitor import TikTokMonitor
     
-    elif args.add:
+    if args.add:
         username = args.add.lstrip('@')
-        monitor.add_user_to_monitor(username)
+        TikTokMonitor().add_user_to_monitor(username)
     
     elif args.remove:
         username = args.remove.lstrip('@')
-        monitor.remove_user_from_monitor(username)
+        TikTokMonitor().remove_user_from_monitor(username)
     
     elif args.delete:
         username = args.delete.lstrip('@')
-        monitor.delete_user_permanently(username)
-    
-    elif args.enable:
-        username = args.enable.lstrip('@')
-        monitor.enable_user(username)
+        TikTokMonitor().delete_user_permanently(username)
     
     else:
-        parser.print_help()
+        username = args.enable.lstrip('@')
+        TikTokMonitor().enable_user(username)
 
 
 if __name__ == "__main__":
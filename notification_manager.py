@@ -6,15 +6,30 @@ Supports Windows, macOS, and Linux
 """
 
 from logger_manager import logger
+from format_utils import format_count
 
-# Try to import plyer, fallback gracefully if not available
-try:
-    from plyer import notification
-    NOTIFICATIONS_AVAILABLE = True
-except ImportError:
-    NOTIFICATIONS_AVAILABLE = False
-    logger.warning("plyer not installed. Desktop notifications disabled.")
-    logger.info("Install with: pip install plyer")
+# plyer is imported on first use (see _get_notification); None = not tried yet
+NOTIFICATIONS_AVAILABLE = None
+_notification = None
+
+
+def _get_notification():
+    """
+    Import plyer's notification facade, fallback gracefully if not available
+    
+    Returns:
+        The plyer notification object, or None if plyer is not installed
+    """
+    global NOTIFICATIONS_AVAILABLE, _notification
+    if NOTIFICATIONS_AVAILABLE is None:
+        try:
+            from plyer import notification as _notification
+            NOTIFICATIONS_AVAILABLE = True
+        except ImportError:
+            NOTIFICATIONS_AVAILABLE = False
+            logger.warning("plyer not installed. Desktop notifications disabled.")
+            logger.info("Install with: pip install plyer")
+    return _notification
 
 
 class NotificationManager:
@@ -31,9 +46,6 @@ class NotificationManager:
     def __init__(self):
         """Initialize notification manager with notifications disabled by default"""
         self.enabled = False  # Default: disabled
-        
-        if not NOTIFICATIONS_AVAILABLE:
-            logger.debug("Notifications not available (plyer not installed)")
     
     def is_available(self):
         """
@@ -42,7 +54,7 @@ class NotificationManager:
         Returns:
             bool: True if plyer is installed and notifications can be sent
         """
-        return NOTIFICATIONS_AVAILABLE
+        return _get_notification() is not None
     
     def enable(self):
         """
@@ -51,7 +63,7 @@ class NotificationManager:
         Returns:
             bool: True if successfully enabled, False if plyer not available
         """
-        if not NOTIFICATIONS_AVAILABLE:
+        if not self.is_available():
             logger.error("Cannot enable notifications: plyer not installed")
             logger.info("Install with: pip install plyer")
             return False
@@ -90,12 +102,12 @@ class NotificationManager:
         Returns:
             bool: True if notification sent successfully, False otherwise
         """
+        # Notifications are off by default: bail out without logging
         if not self.enabled:
-            logger.debug(f"Notification not sent (disabled): {title}")
             return False
         
-        if not NOTIFICATIONS_AVAILABLE:
-            logger.debug(f"Notification not sent (plyer unavailable): {title}")
+        notification = _get_notification()
+        if notification is None:
             return False
         
         try:
@@ -122,6 +134,11 @@ class NotificationManager:
             views (int, optional): View count
             likes (int, optional): Like count
         """
+        # Nothing to build if the notification won't be shown
+        # (enable() only succeeds once plyer has been imported)
+        if not self.enabled:
+            return
+        
         # Truncate title if too long for notification
         short_title = title[:50] + "..." if len(title) > 50 else title
         
@@ -129,24 +146,10 @@ class NotificationManager:
         message_parts = [f"@{username} - {short_title}"]
         
         if views is not None:
-            # Format views nicely (1.2M, 450K, etc.)
-            if views >= 1_000_000:
-                views_str = f"{views / 1_000_000:.1f}M"
-            elif views >= 1_000:
-                views_str = f"{views / 1_000:.0f}K"
-            else:
-                views_str = str(views)
-            message_parts.append(f"👁️ {views_str} views")
+            message_parts.append(f"👁️ {format_count(views)} views")
         
         if likes is not None:
-            # Format likes nicely
-            if likes >= 1_000_000:
-                likes_str = f"{likes / 1_000_000:.1f}M"
-            elif likes >= 1_000:
-                likes_str = f"{likes / 1_000:.0f}K"
-            else:
-                likes_str = str(likes)
-            message_parts.append(f"❤️ {likes_str} likes")
+            message_parts.append(f"❤️ {format_count(likes)} likes")
         
         message = "\n".join(message_parts)
         
@@ -176,7 +179,7 @@ class NotificationManager:
         Returns:
             str: Status text (e.g., "Enabled ✅", "Disabled ❌", "Not available")
         """
-        if not NOTIFICATIONS_AVAILABLE:
+        if not self.is_available():
             return "Not available (plyer not installed)"
         elif self.enabled:
             return "Enabled ✅"
@@ -188,30 +191,12 @@ class NotificationManager:
 notifier = NotificationManager()
 
 
-# Convenience functions for easy import and use
-def enable_notifications():
-    """
-    Enable notifications globally
-    
-    Returns:
-        bool: True if successfully enabled
-    """
-    return notifier.enable()
-
-
-def disable_notifications():
-    """Disable notifications globally"""
-    notifier.disable()
-
-
-def toggle_notifications():
-    """
-    Toggle notifications globally
-    
-    Returns:
-        bool: New state (True = enabled)
-    """
-    return notifier.toggle()
+# Convenience functions for easy import and use (bound to the global instance)
+enable_notifications = notifier.enable  # Returns True if successfully enabled
+disable_notifications = notifier.disable
+toggle_notifications = notifier.toggle  # Returns the new state (True = enabled)
+notify_video = notifier.notify_video_downloaded
+get_status = notifier.get_status_text
 
 
 def is_enabled():
@@ -222,26 +207,3 @@ def is_enabled():
         bool: True if enabled
     """
     return notifier.enabled
-
-
-def notify_video(username, title, views=None, likes=None):
-    """
-    Send video downloaded notification (convenience function)
-    
-    Args:
-        username (str): TikTok username
-        title (str): Video title
-        views (int, optional): View count
-        likes (int, optional): Like count
-    """
-    notifier.notify_video_downloaded(username, title, views, likes)
-
-
-def get_status():
-    """
-    Get notification status text (convenience function)
-    
-    Returns:
-        str: Status text for display
-    """
-    return notifier.get_status_text()
@@ -3,9 +3,11 @@
 Retry utilities for handling network errors and TikTok API issues
 """
 
-import time
+import re
 import random
-from functools import wraps
+import threading
+from functools import update_wrapper
+from types import MethodType
 from logger_manager import logger
 
 
@@ -32,6 +34,45 @@ class RetryConfig:
     BACKOFF_MULTIPLIER = 2
 
 
+# Precomputed backoff multipliers; past the last entry the 3x cap always wins
+_BACKOFF = tuple(RetryConfig.BACKOFF_MULTIPLIER ** i for i in range(16))
+_LAST_BACKOFF = len(_BACKOFF) - 1
+
+# Error message patterns checked by retry_on_api_error
+_RATE_LIMIT_RE = re.compile(r'rate limit|429|too many', re.I)
+_TEMP_ERR_RE = re.compile(
+    r'timeout|timed out|connection|temporary|unavailable|try again|503|502|504',
+    re.I
+)
+
+# Private generator so retries don't contend on the global random state
+_rng = random.Random()
+
+# Set by request_shutdown() to cut pending retry waits short
+_SHUTDOWN = threading.Event()
+
+
+def request_shutdown():
+    """Wake up every pending retry wait and make it raise KeyboardInterrupt"""
+    _SHUTDOWN.set()
+
+
+def clear_shutdown():
+    """Re-arm retry waits once a requested shutdown has been handled"""
+    _SHUTDOWN.clear()
+
+
+def _sleep(seconds):
+    """
+    Wait like time.sleep, but return early if shutdown was requested
+    
+    Raises:
+        KeyboardInterrupt: If request_shutdown() was called
+    """
+    if _SHUTDOWN.wait(seconds):
+        raise KeyboardInterrupt('shutdown requested')
+
+
 def get_retry_delay(min_delay, max_delay, attempt=1, exponential=False):
     """
     Calculate retry delay with optional exponential backoff
@@ -45,18 +86,136 @@ def get_retry_delay(min_delay, max_delay, attempt=1, exponential=False):
     Returns:
         int: Delay in seconds
     """
+    # Random delay within range (uniform() without the extra method call)
+    delay = min_delay + (max_delay - min_delay) * _rng.random()
+    
     if exponential and RetryConfig.USE_EXPONENTIAL_BACKOFF:
         # Exponential backoff: delay increases with each attempt
-        base_delay = random.uniform(min_delay, max_delay)
-        multiplier = RetryConfig.BACKOFF_MULTIPLIER ** (attempt - 1)
-        delay = min(base_delay * multiplier, max_delay * 3)  # Cap at 3x max
-    else:
-        # Random delay within range
-        delay = random.uniform(min_delay, max_delay)
+        index = attempt - 1
+        if index < 0:
+            index = 0
+        elif index > _LAST_BACKOFF:
+            index = _LAST_BACKOFF
+        delay = min(delay * _BACKOFF[index], max_delay * 3)  # Cap at 3x max
     
     return int(delay)
 
 
+class _Retry:
+    """
+    Base for the retry decorators: wraps func and keeps the retry settings
+    as slot attributes (e.g. download.max_retries) for introspection
+    
+    __dict__ is kept only to carry the metadata copied by update_wrapper.
+    """
+    
+    __slots__ = ('func', 'max_retries', 'delay_range', '__dict__', '__weakref__')
+    
+    def __init__(self, func, max_retries, delay_range):
+        self.func = func
+        self.max_retries = max_retries
+        self.delay_range = delay_range
+        update_wrapper(self, func)
+    
+    def __get__(self, instance, owner=None):
+        # Bind like a plain function when used to decorate a method
+        if instance is None:
+            return self
+        return MethodType(self, instance)
+
+
+class _NetworkRetry(_Retry):
+    """Retry func on ConnectionError, TimeoutError and OSError"""
+    
+    __slots__ = ()
+    
+    def __call__(self, *args, **kwargs):
+        # Bind lookups used in the retry loop to locals
+        func = self.func
+        max_retries = self.max_retries
+        min_delay, max_delay = self.delay_range
+        sleep = _sleep
+        _warn = logger.warning
+        _retry = logger.retry_attempt
+        _err = logger.error
+        _calc = get_retry_delay
+        
+        for attempt in range(1, max_retries + 1):
+            try:
+                return func(*args, **kwargs)
+                
+            except (ConnectionError, TimeoutError, OSError) as e:
+                if attempt < max_retries:
+                    wait_time = _calc(min_delay, max_delay, attempt, exponential=True)
+                    
+                    _warn(f"Network error in {func.__name__}: {e}")
+                    _retry(attempt, max_retries, wait_time)
+                    
+                    sleep(wait_time)
+                else:
+                    _err(
+                        f"Max retries ({max_retries}) reached for {func.__name__}"
+                    )
+                    raise
+                    
+        return None
+
+
+class _ApiRetry(_Retry):
+    """Retry func on temporary API errors, waiting out rate limits"""
+    
+    __slots__ = ('rate_limit_wait',)
+    
+    def __init__(self, func, max_retries, delay_range, rate_limit_wait):
+        super().__init__(func, max_retries, delay_range)
+        self.rate_limit_wait = rate_limit_wait
+    
+    def __call__(self, *args, **kwargs):
+        # Bind lookups used in the retry loop to locals
+        func = self.func
+        max_retries = self.max_retries
+        min_delay, max_delay = self.delay_range
+        rate_limit_wait = self.rate_limit_wait
+        sleep = _sleep
+        _warn = logger.warning
+        _retry = logger.retry_attempt
+        _err = logger.error
+        _calc = get_retry_delay
+        
+        for attempt in range(1, max_retries + 1):
+            try:
+                return func(*args, **kwargs)
+                
+            except Exception as e:
+                error_msg = str(e)
+                
+                # Check for rate limiting
+                if _RATE_LIMIT_RE.search(error_msg):
+                    logger.rate_limit_detected(rate_limit_wait)
+                    sleep(rate_limit_wait)
+                    continue
+                
+                # Check for temporary errors
+                is_temporary = _TEMP_ERR_RE.search(error_msg) is not None
+                
+                if is_temporary and attempt < max_retries:
+                    wait_time = _calc(min_delay, max_delay, attempt, exponential=True)
+                    
+                    _warn(f"API error in {func.__name__}: {error_msg}")
+                    _retry(attempt, max_retries, wait_time)
+                    
+                    sleep(wait_time)
+                else:
+                    # Non-retryable error or max retries reached
+                    if attempt >= max_retries:
+                        _err(
+                            f"Max retries ({max_retries}) reached for {func.__name__}"
+                        )
+                    raise
+                    
+        return None
+
+
 def retry_on_network_error(max_retries=None, delay_range=None):
     """
     Decorator for retrying functions on network errors
@@ -72,40 +231,7 @@ def retry_on_network_error(max_retries=None, delay_range=None):
         delay_range = RetryConfig.NETWORK_RETRY_DELAY
     
     def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            last_exception = None
-            
-            for attempt in range(1, max_retries + 1):
-                try:
-                    return func(*args, **kwargs)
-                    
-                except (ConnectionError, TimeoutError, OSError) as e:
-                    last_exception = e
-                    
-                    if attempt < max_retries:
-                        wait_time = get_retry_delay(
-                            delay_range[0], 
-                            delay_range[1], 
-                            attempt,
-                            exponential=True
-                        )
-                        
-                        logger.warning(
-                            f"Network error in {func.__name__}: {str(e)}"
-                        )
-                        logger.retry_attempt(attempt, max_retries, wait_time)
-                        
-                        time.sleep(wait_time)
-                    else:
-                        logger.error(
-                            f"Max retries ({max_retries}) reached for {func.__name__}"
-                        )
-                        raise last_exception
-                        
-            return None
-            
-        return wrapper
+        return _NetworkRetry(func, max_retries, delay_range)
     return decorator
 
 
@@ -122,79 +248,33 @@ def retry_on_api_error(max_retries=None, delay_range=None, rate_limit_wait=None)
         rate_limit_wait = RetryConfig.RATE_LIMIT_WAIT
     
     def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            last_exception = None
-            
-            for attempt in range(1, max_retries + 1):
-                try:
-                    return func(*args, **kwargs)
-                    
-                except Exception as e:
-                    last_exception = e
-                    error_msg = str(e).lower()
-                    
-                    # Check for rate limiting
-                    if 'rate limit' in error_msg or '429' in error_msg or 'too many' in error_msg:
-                        logger.rate_limit_detected(rate_limit_wait)
-                        time.sleep(rate_limit_wait)
-                        continue
-                    
-                    # Check for temporary errors
-                    temporary_errors = [
-                        'timeout', 'timed out', 'connection', 'temporary',
-                        'unavailable', 'try again', '503', '502', '504'
-                    ]
-                    
-                    is_temporary = any(err in error_msg for err in temporary_errors)
-                    
-                    if is_temporary and attempt < max_retries:
-                        wait_time = get_retry_delay(
-                            delay_range[0],
-                            delay_range[1],
-                            attempt,
-                            exponential=True
-                        )
-                        
-                        logger.warning(
-                            f"API error in {func.__name__}: {str(e)}"
-                        )
-                        logger.retry_attempt(attempt, max_retries, wait_time)
-                        
-                        time.sleep(wait_time)
-                    else:
-                        # Non-retryable error or max retries reached
-                        if attempt >= max_retries:
-                            logger.error(
-                                f"Max retries ({max_retries}) reached for {func.__name__}"
-                            )
-                        raise last_exception
-                        
-            return None
-            
-        return wrapper
+        return _ApiRetry(func, max_retries, delay_range, rate_limit_wait)
     return decorator
 
 
-def safe_execute(func, *args, default=None, log_error=True, **kwargs):
+def safe_execute(func, *args, default=None, log_error=True, exc_info=False, **kwargs):
     """
     Safely execute a function and return default on error
     
     Args:
-        func: Function to execute
+        func: Function to execute (None returns default)
         *args: Function arguments
         default: Default value to return on error
         log_error: Whether to log errors
+        exc_info: Whether to include the traceback in the log
         **kwargs: Function keyword arguments
     
     Returns:
         Function result or default value
     """
+    if func is None:
+        return default
     try:
         return func(*args, **kwargs)
     except Exception as e:
         if log_error:
-            logger.error(f"Error in {func.__name__}: {str(e)}", exc_info=True)
+            name = getattr(func, '__name__', None) or repr(func)
+            logger.error(f"Error in {name}: {e}", exc_info=exc_info)
         return default
 
 
@@ -250,7 +330,7 @@ class RetryContext:
             logger.warning(f"Attempt {self.attempt} failed: {str(error)}")
             logger.retry_attempt(self.attempt, self.max_retries, wait_time)
             
-            time.sleep(wait_time)
+            _sleep(wait_time)
         else:
             logger.error(f"All {self.max_retries} attempts failed")
             if self.last_error:
@@ -261,6 +341,25 @@ class RetryContext:
         self._success = True
 
 
+def get_backoff_wait(base_wait, attempt, factor=2, cap=600, jitter_percent=0.25):
+    """
+    Exponential backoff with jitter around a recommended first wait
+    
+    Args:
+        base_wait: Wait before the first retry (e.g. ErrorHandler.get_wait_time)
+        attempt: Number of the attempt that just failed (1 = first)
+        factor: Growth factor per further attempt
+        cap: Maximum wait before jitter is added, in seconds
+        jitter_percent: Up to this fraction of the wait is added at random,
+            so parallel downloads don't retry in lockstep
+    
+    Returns:
+        int: Seconds to wait
+    """
+    delay = min(base_wait * factor ** (attempt - 1), cap)
+    return int(delay + delay * jitter_percent * _rng.random())
+
+
 def wait_with_jitter(base_seconds, jitter_percent=0.1):
     """
     Wait for specified seconds with random jitter
@@ -271,4 +370,4 @@ def wait_with_jitter(base_seconds, jitter_percent=0.1):
     """
     jitter = base_seconds * jitter_percent
     wait_time = base_seconds + random.uniform(-jitter, jitter)
-    time.sleep(max(0, wait_time))
+    _sleep(max(0, wait_time))
@@ -6,53 +6,97 @@ These tests verify core functionality without making real TikTok API calls
 import unittest
 import sqlite3
 import os
+import re
 import tempfile
 from datetime import datetime
+from urllib.parse import urlsplit
+
+# numpy is optional: it lets the delay tests draw large samples cheaply
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+def _open_db(path):
+    """Open a test database with durability turned off (no fsync on commit)"""
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        'PRAGMA journal_mode=MEMORY; PRAGMA synchronous=OFF; '
+        'PRAGMA temp_store=MEMORY; PRAGMA locking_mode=EXCLUSIVE;'
+    )
+    return conn
+
+
+# Hosts accepted as TikTok URLs
+_TIKTOK_HOSTS = frozenset({'tiktok.com', 'www.tiktok.com', 'vm.tiktok.com', 'm.tiktok.com'})
+
+# Anything outside this set is replaced when building filenames
+_UNSAFE_FILENAME_CHARS = re.compile(r'[^A-Za-z0-9._-]')
+
+
+def _uniform_bounds(low, high, size=10_000):
+    """Draw size uniform samples in [low, high] and return their (min, max)"""
+    if NUMPY_AVAILABLE:
+        samples = np.random.uniform(low, high, size)
+        return samples.min(), samples.max()
+
+    import random
+    rng = random.Random()
+    samples = [rng.uniform(low, high) for _ in range(size)]
+    return min(samples), max(samples)
 
 
 class TestDatabaseSetup(unittest.TestCase):
     """Tests to verify SQLite database functionality"""
 
-    def setUp(self):
-        """Create a temporary database for each test"""
-        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-        self.db_path = self.temp_db.name
-        self.temp_db.close()
+    @classmethod
+    def setUpClass(cls):
+        """Open one in-memory database shared by all tests"""
+        cls.conn = _open_db(':memory:')
+
+    @classmethod
+    def tearDownClass(cls):
+        """Close the shared database"""
+        cls.conn.close()
 
-    def tearDown(self):
-        """Remove temporary database after each test"""
-        if os.path.exists(self.db_path):
-            os.unlink(self.db_path)
+    def setUp(self):
+        """Start each test without a videos table"""
+        self.conn.execute('DROP TABLE IF EXISTS videos')
 
     def test_database_creation(self):
         """Verify that database can be created"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Create videos table (mimics project structure)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS videos (
-                id TEXT PRIMARY KEY,
-                url TEXT,
-                title TEXT,
-                author TEXT,
-                timestamp INTEGER,
-                likes INTEGER,
-                views INTEGER,
-                file_path TEXT,
-                download_date TEXT
-            )
-        ''')
+        # This test checks the file itself, so it uses a real on-disk database
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, 'test.db')
+            conn = _open_db(db_path)
+            cursor = conn.cursor()
+
+            # Create videos table (mimics project structure)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS videos (
+                    id TEXT PRIMARY KEY,
+                    url TEXT,
+                    title TEXT,
+                    author TEXT,
+                    timestamp INTEGER,
+                    likes INTEGER,
+                    views INTEGER,
+                    file_path TEXT,
+                    download_date TEXT
+                )
+            ''')
 
-        conn.commit()
-        conn.close()
+            conn.commit()
+            conn.close()
 
-        # Verify file exists
-        self.assertTrue(os.path.exists(self.db_path))
+            # Verify file exists
+            self.assertTrue(os.path.exists(db_path))
 
     def test_insert_video(self):
         """Verify that videos can be inserted into database"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.conn
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -64,34 +108,40 @@ class TestDatabaseSetup(unittest.TestCase):
             )
         ''')
 
-        # Insert test video
+        # Insert test videos in one batch
         test_video = {
             'id': '7234567890123456789',
             'url': 'https://www.tiktok.com/@test/video/7234567890123456789',
             'author': 'testuser',
             'timestamp': 1234567890
         }
+        rows = [(test_video['id'], test_video['url'], test_video['author'], test_video['timestamp'])]
+        rows += [
+            (str(n), f'https://www.tiktok.com/@test/video/{n}', 'testuser', 1234567890 + n)
+            for n in range(1, 50)
+        ]
 
-        cursor.execute('''
-            INSERT INTO videos (id, url, author, timestamp)
-            VALUES (?, ?, ?, ?)
-        ''', (test_video['id'], test_video['url'], test_video['author'], test_video['timestamp']))
-
-        conn.commit()
+        # Single transaction: committed once when the block exits
+        with conn:
+            conn.executemany('''
+                INSERT INTO videos (id, url, author, timestamp)
+                VALUES (?, ?, ?, ?)
+            ''', rows)
 
         # Verify insertion
+        cursor.execute('SELECT COUNT(*) FROM videos')
+        self.assertEqual(cursor.fetchone()[0], len(rows))
+
         cursor.execute('SELECT * FROM videos WHERE id = ?', (test_video['id'],))
         result = cursor.fetchone()
 
-        conn.close()
-
         self.assertIsNotNone(result)
         self.assertEqual(result[0], test_video['id'])
         self.assertEqual(result[2], test_video['author'])
 
     def test_prevent_duplicate_videos(self):
         """Verify that duplicate video IDs are prevented"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.conn
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -110,8 +160,6 @@ class TestDatabaseSetup(unittest.TestCase):
             cursor.execute('INSERT INTO videos (id, url) VALUES (?, ?)', ('123', 'url2'))
             conn.commit()
 
-        conn.close()
-
 
 class TestTimestampFiltering(unittest.TestCase):
     """Tests for timestamp-based filtering logic"""
@@ -144,6 +192,32 @@ class TestTimestampFiltering(unittest.TestCase):
         self.assertEqual(new_videos[0]['id'], '2')
         self.assertEqual(new_videos[1]['id'], '3')
 
+    def test_filter_new_videos_in_database(self):
+        """Filter new videos with an indexed range query instead of a Python scan"""
+        last_saved_timestamp = 1650000000
+
+        conn = _open_db(':memory:')
+        try:
+            conn.execute('CREATE TABLE videos (id TEXT PRIMARY KEY, timestamp INTEGER)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_videos_ts ON videos(timestamp)')
+            with conn:
+                conn.executemany('INSERT INTO videos (id, timestamp) VALUES (?, ?)', [
+                    ('1', 1640000000),  # Old
+                    ('2', 1660000000),  # New
+                    ('3', 1670000000),  # New
+                    ('4', 1645000000),  # Old
+                ])
+
+            query = 'SELECT id FROM videos WHERE timestamp > ? ORDER BY timestamp'
+            new_ids = [row[0] for row in conn.execute(query, (last_saved_timestamp,))]
+            plan = ' '.join(row[-1] for row in conn.execute('EXPLAIN QUERY PLAN ' + query,
+                                                            (last_saved_timestamp,)))
+        finally:
+            conn.close()
+
+        self.assertEqual(new_ids, ['2', '3'])
+        self.assertIn('idx_videos_ts', plan)
+
     def test_no_new_videos(self):
         """Test when all videos are old"""
         last_saved_timestamp = 1700000000
@@ -171,8 +245,9 @@ class TestURLValidation(unittest.TestCase):
         ]
 
         for url in valid_urls:
-            # Simple check that URL contains 'tiktok.com'
-            self.assertIn('tiktok.com', url.lower())
+            # Check the parsed host, not just a substring of the URL
+            with self.subTest(url=url):
+                self.assertIn(urlsplit(url).hostname, _TIKTOK_HOSTS)
 
     def test_invalid_url(self):
         """Verify invalid URLs are rejected"""
@@ -181,15 +256,17 @@ class TestURLValidation(unittest.TestCase):
             'https://instagram.com/p/abc123',
             'not a url at all',
             'https://www.facebook.com/video',
+            'https://evil.com/tiktok.com',
         ]
 
         for url in invalid_urls:
-            self.assertNotIn('tiktok.com', url.lower())
+            with self.subTest(url=url):
+                self.assertNotIn(urlsplit(url).hostname, _TIKTOK_HOSTS)
 
     def test_url_with_parameters(self):
         """Test URL with query parameters"""
         url = 'https://www.tiktok.com/@user/video/123?lang=en&is_copy_url=1'
-        self.assertIn('tiktok.com', url.lower())
+        self.assertIn(urlsplit(url).hostname, _TIKTOK_HOSTS)
 
 
 class TestFileNaming(unittest.TestCase):
@@ -213,13 +290,13 @@ class TestFileNaming(unittest.TestCase):
         unsafe_name = "user@name/with\\invalid:chars*.txt"
 
         # Remove invalid characters
-        safe_chars = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_."
-        safe_name = ''.join(c if c in safe_chars else '_' for c in unsafe_name)
+        safe_name = _UNSAFE_FILENAME_CHARS.sub('_', unsafe_name)
 
         self.assertNotIn('/', safe_name)
         self.assertNotIn('\\', safe_name)
         self.assertNotIn('*', safe_name)
         self.assertNotIn(':', safe_name)
+        self.assertEqual(safe_name, "user_name_with_invalid_chars_.txt")
 
     def test_filename_length(self):
         """Test that very long filenames are handled"""
@@ -234,11 +311,15 @@ class TestFileNaming(unittest.TestCase):
 
 
 class TestAntiDuplicateLogic(unittest.TestCase):
-    """Tests for anti-duplicate logic"""
+    """Tests for anti-duplicate logic
+
+    Downloaded IDs are kept in a set so each membership check is a hash
+    lookup (O(1)) rather than a scan of the whole list (O(n)).
+    """
 
     def test_duplicate_detection(self):
         """Verify duplicates are detected"""
-        downloaded_ids = ['123', '456', '789']
+        downloaded_ids = {'123', '456', '789'}
 
         new_video_id = '456'  # This is a duplicate
 
@@ -247,7 +328,7 @@ class TestAntiDuplicateLogic(unittest.TestCase):
 
     def test_unique_video(self):
         """Verify unique videos are recognized"""
-        downloaded_ids = ['123', '456', '789']
+        downloaded_ids = {'123', '456', '789'}
 
         new_video_id = '999'  # This is new
 
@@ -256,7 +337,7 @@ class TestAntiDuplicateLogic(unittest.TestCase):
 
     def test_empty_downloaded_list(self):
         """Test with no previously downloaded videos"""
-        downloaded_ids = []
+        downloaded_ids = set()
 
         new_video_id = '123'
 
@@ -265,54 +346,70 @@ class TestAntiDuplicateLogic(unittest.TestCase):
 
     def test_case_sensitivity(self):
         """Test that video IDs are case-sensitive"""
-        downloaded_ids = ['abc123']
+        downloaded_ids = {'abc123'}
 
         # Different case should be different video
         self.assertNotIn('ABC123', downloaded_ids)
         self.assertIn('abc123', downloaded_ids)
 
+    def test_ids_loaded_from_database(self):
+        """Build the downloaded-ID set once from the database, then check membership"""
+        conn = _open_db(':memory:')
+        try:
+            conn.execute('CREATE TABLE videos (id TEXT PRIMARY KEY)')
+            with conn:
+                conn.executemany('INSERT INTO videos (id) VALUES (?)',
+                                 [(str(n),) for n in range(1000)])
+
+            downloaded_ids = {row[0] for row in conn.execute('SELECT id FROM videos')}
+        finally:
+            conn.close()
+
+        self.assertEqual(len(downloaded_ids), 1000)
+        self.assertIn('456', downloaded_ids)
+        self.assertNotIn('1000', downloaded_ids)
+
 
 class TestDelayLogic(unittest.TestCase):
     """Tests for anti-bot delay calculations"""
 
     def test_delay_range(self):
         """Verify delay is within expected range"""
-        import random
-
         # Simulate random delay between downloads
         min_delay = 5
         max_delay = 15
 
-        for _ in range(10):
-            delay = random.uniform(min_delay, max_delay)
-            self.assertGreaterEqual(delay, min_delay)
-            self.assertLessEqual(delay, max_delay)
+        lowest, highest = _uniform_bounds(min_delay, max_delay)
+        self.assertGreaterEqual(lowest, min_delay)
+        self.assertLessEqual(highest, max_delay)
 
     def test_user_delay_range(self):
         """Verify delay between users is within range"""
-        import random
-
         min_delay = 10
         max_delay = 30
 
-        for _ in range(10):
-            delay = random.uniform(min_delay, max_delay)
-            self.assertGreaterEqual(delay, min_delay)
-            self.assertLessEqual(delay, max_delay)
+        lowest, highest = _uniform_bounds(min_delay, max_delay)
+        self.assertGreaterEqual(lowest, min_delay)
+        self.assertLessEqual(highest, max_delay)
 
 
 class TestMonitoredUsers(unittest.TestCase):
     """Tests for monitored users database operations"""
 
-    def setUp(self):
-        """Setup temporary database"""
-        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-        self.db_path = self.temp_db.name
-        self.temp_db.close()
+    @classmethod
+    def setUpClass(cls):
+        """Open one in-memory database shared by all tests"""
+        cls.conn = _open_db(':memory:')
 
-        # Create monitored_users table
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    @classmethod
+    def tearDownClass(cls):
+        """Close the shared database"""
+        cls.conn.close()
+
+    def setUp(self):
+        """Recreate an empty monitored_users table"""
+        cursor = self.conn.cursor()
+        cursor.execute('DROP TABLE IF EXISTS monitored_users')
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS monitored_users (
                 username TEXT PRIMARY KEY,
@@ -322,17 +419,11 @@ class TestMonitoredUsers(unittest.TestCase):
                 active INTEGER DEFAULT 1
             )
         ''')
-        conn.commit()
-        conn.close()
-
-    def tearDown(self):
-        """Cleanup"""
-        if os.path.exists(self.db_path):
-            os.unlink(self.db_path)
+        self.conn.commit()
 
     def test_add_monitored_user(self):
         """Test adding a user to monitoring"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.conn
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -345,14 +436,12 @@ class TestMonitoredUsers(unittest.TestCase):
         cursor.execute('SELECT * FROM monitored_users WHERE username = ?', ('testuser',))
         result = cursor.fetchone()
 
-        conn.close()
-
         self.assertIsNotNone(result)
         self.assertEqual(result[0], 'testuser')
 
     def test_update_last_check(self):
         """Test updating last check timestamp"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.conn
         cursor = conn.cursor()
 
         # Insert user
@@ -375,8 +464,6 @@ class TestMonitoredUsers(unittest.TestCase):
         cursor.execute('SELECT last_check FROM monitored_users WHERE username = ?', ('testuser',))
         result = cursor.fetchone()
 
-        conn.close()
-
         self.assertEqual(result[0], new_timestamp)
 
 
@@ -7,6 +7,7 @@ These tests cover the essential functionality without over-engineering
 import unittest
 import sys
 import os
+import shutil
 import tempfile
 import yaml
 
@@ -15,6 +16,10 @@ sys.path.insert(0, os. path.dirname(os.path.dirname(os.path. abspath(__file__)))
 
 from error_handler import ErrorHandler, ErrorType, UserFriendlyError
 
+# Prefer the libyaml C bindings, like config_manager does
+_Loader = yaml.CSafeLoader if hasattr(yaml, 'CSafeLoader') else yaml.SafeLoader
+_Dumper = yaml.CSafeDumper if hasattr(yaml, 'CSafeDumper') else yaml.SafeDumper
+
 
 # ERROR HANDLER TESTS
 
@@ -75,6 +80,18 @@ class TestErrorClassification(unittest.TestCase):
         result = ErrorHandler.analyze_error(Exception("random xyz error"))
         self. assertEqual(result.error_type, ErrorType.UNKNOWN)
 
+    def test_fallback_scan_respects_priority(self):
+        """Test the keyword-table fallback picks the highest-priority type, not the first hit"""
+        import error_handler
+
+        msg = "connection timed out: video removed (404)"
+        automaton, error_handler._AUTOMATON = error_handler._AUTOMATON, None
+        try:
+            best = min(error_handler._match_priorities(msg))
+        finally:
+            error_handler._AUTOMATON = automaton
+        self.assertEqual(error_handler.ERROR_KEYWORDS[best][0], ErrorType.DELETED_VIDEO)
+
 
 class TestRetryLogic(unittest.TestCase):
     """Tests for retry decision logic"""
@@ -159,6 +176,23 @@ class TestConfigManager(unittest.TestCase):
         manager.set('new.nested.key', 'value')
         self. assertEqual(manager. get('new.nested.key'), 'value')
 
+    def test_set_invalidates_cached_get(self):
+        """Test set() is visible to later get() calls on the same key"""
+        from config_manager import ConfigManager
+
+        manager = ConfigManager.__new__(ConfigManager)
+        manager._config = {}
+
+        self.assertEqual(manager.get('monitor.interval_minutes', 30), 30)
+        manager.set('monitor.interval_minutes', 60)
+        self.assertEqual(manager.get('monitor.interval_minutes', 30), 60)
+
+    def test_get_instance_is_shared(self):
+        """Test get_instance() builds the config once and reuses it"""
+        from config_manager import ConfigManager
+
+        self.assertIs(ConfigManager.get_instance(), ConfigManager.get_instance())
+
     def test_merge_config(self):
         """Test config merging preserves defaults and adds user values"""
         from config_manager import ConfigManager
@@ -173,29 +207,62 @@ class TestConfigManager(unittest.TestCase):
         self.assertEqual(merged['section']['key1'], 'user1')  # Overridden
         self.assertEqual(merged['section']['key2'], 'default2')  # Kept default
         self. assertEqual(merged['new_section']['key'], 'value')  # New section
+        self.assertEqual(default['section']['key1'], 'default1')  # Defaults untouched
+
+    def test_yaml_cache_invalidated_on_change(self):
+        """Test parsed YAML is cached and reparsed when the file changes"""
+        from config_manager import ConfigManager
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = ConfigManager.__new__(ConfigManager)
+            manager.config_file = os.path.join(temp_dir, 'config.yaml')
+
+            with open(manager.config_file, 'w') as f:
+                f.write('monitor:\n  interval_minutes: 45\n')
+            self.assertEqual(manager._load_cached_yaml()['monitor']['interval_minutes'], 45)
+            self.assertTrue(os.path.exists(manager.config_file + '.cache'))
+            self.assertEqual(manager._load_cached_yaml()['monitor']['interval_minutes'], 45)
+
+            # A corrupt cache is ignored and rebuilt from the YAML
+            with open(manager.config_file + '.cache', 'wb') as f:
+                f.write(b'not a pickle')
+            self.assertEqual(manager._load_cached_yaml()['monitor']['interval_minutes'], 45)
+
+            with open(manager.config_file, 'w') as f:
+                f.write('monitor:\n  interval_minutes: 120\n')
+            self.assertEqual(manager._load_cached_yaml()['monitor']['interval_minutes'], 120)
 
 
 class TestConfigFileLoading(unittest.TestCase):
     """Tests for YAML config file loading"""
 
+    @classmethod
+    def setUpClass(cls):
+        # One directory for the whole class; each test uses its own file
+        cls.temp_dir = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
+
     def setUp(self):
-        self.temp_dir = tempfile.mkdtemp()
-        self.config_path = os.path. join(self.temp_dir, 'test_config.yaml')
+        self.config_path = os.path.join(self.temp_dir, f'{self._testMethodName}.yaml')
 
     def tearDown(self):
-        if os.path.exists(self.config_path):
+        try:
             os.unlink(self.config_path)
-        os.rmdir(self.temp_dir)
+        except FileNotFoundError:
+            pass
 
     def test_load_valid_yaml(self):
         """Test loading valid YAML"""
         config = {'monitor': {'interval_minutes': 45}}
         
         with open(self. config_path, 'w') as f:
-            yaml. dump(config, f)
+            yaml.dump(config, f, Dumper=_Dumper)
         
         with open(self.config_path, 'r') as f:
-            loaded = yaml.safe_load(f)
+            loaded = yaml.load(f, Loader=_Loader)
         
         self.assertEqual(loaded['monitor']['interval_minutes'], 45)
 
@@ -205,7 +272,7 @@ class TestConfigFileLoading(unittest.TestCase):
             f.write('')
         
         with open(self.config_path, 'r') as f:
-            loaded = yaml.safe_load(f)
+            loaded = yaml.load(f, Loader=_Loader)
         
         self.assertIsNone(loaded)
 # RETRY UTILS TESTS
@@ -231,6 +298,52 @@ class TestRetryUtils(unittest.TestCase):
         # Average of later attempts should be higher
         self.assertLessEqual(delays[0], delays[2] + 10)  # Allow some variance
 
+    def test_backoff_wait_grows_and_is_capped(self):
+        """Test backoff doubles per attempt and stays within cap plus jitter"""
+        from retry_utils import get_backoff_wait
+        
+        self.assertEqual(get_backoff_wait(30, 1, jitter_percent=0), 30)
+        self.assertEqual(get_backoff_wait(30, 3, jitter_percent=0), 120)
+        for _ in range(10):
+            self.assertLessEqual(get_backoff_wait(30, 10, cap=100, jitter_percent=0.25), 125)
+
+    def test_wait_after_handled_shutdown(self):
+        """Test waits abort after a shutdown request and sleep again once cleared"""
+        import time
+        from retry_utils import request_shutdown, clear_shutdown, wait_with_jitter
+        
+        request_shutdown()
+        try:
+            with self.assertRaises(KeyboardInterrupt):
+                wait_with_jitter(5)
+        finally:
+            clear_shutdown()
+        
+        start = time.monotonic()
+        wait_with_jitter(0.05, jitter_percent=0)
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+    def test_network_retry_decorator(self):
+        """Test decorated functions and methods retry, keep metadata and expose settings"""
+        from retry_utils import retry_on_network_error
+        
+        class Client:
+            calls = 0
+            
+            @retry_on_network_error(max_retries=3, delay_range=(0, 0))
+            def fetch(self):
+                """Fetch something"""
+                self.calls += 1
+                if self.calls < 3:
+                    raise ConnectionError("reset")
+                return "ok"
+        
+        client = Client()
+        self.assertEqual(client.fetch(), "ok")
+        self.assertEqual(client.calls, 3)
+        self.assertEqual(Client.fetch.__name__, "fetch")
+        self.assertEqual(Client.fetch.max_retries, 3)
+
     def test_safe_execute_returns_default_on_error(self):
         """Test safe_execute returns default on exception"""
         from retry_utils import safe_execute
@@ -262,17 +375,239 @@ class TestNotificationManager(unittest.TestCase):
         result = manager.send("Title", "Message")
         self. assertFalse(result)
 
+    def test_monitor_does_not_import_plyer(self):
+        """Test constructing a monitor with notifications off leaves plyer unimported"""
+        import subprocess
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        code = (
+            "import sys; sys.path.insert(0, %r)\n"
+            "from tiktok_monitor import TikTokMonitor\n"
+            "TikTokMonitor('downloads', 'monitor.db')\n"
+            "print('plyer' in sys.modules)\n" % root
+        )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            result = subprocess.run(
+                [sys.executable, '-c', code], cwd=tmpdir,
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True
+            )
+        self.assertEqual(result.stdout.decode().split()[-1], 'False')
+
     def test_views_formatting(self):
         """Test view count formatting"""
-        # Millions
-        views = 1500000
-        formatted = f"{views / 1_000_000:.1f}M" if views >= 1_000_000 else str(views)
-        self.assertEqual(formatted, "1.5M")
+        from format_utils import format_count
         
-        # Thousands
-        views = 45000
-        formatted = f"{views / 1_000:.0f}K" if views >= 1_000 else str(views)
-        self.assertEqual(formatted, "45K")
+        self.assertEqual(format_count(2_300_000_000), "2.3B")  # Billions
+        self.assertEqual(format_count(1500000), "1.5M")  # Millions
+        self.assertEqual(format_count(45000), "45K")  # Thousands
+        self.assertEqual(format_count(999), "999")
+
+
+
+# USERS DB TESTS
+
+
+class TestUsersDb(unittest.TestCase):
+    """Tests for the read-only monitored-users listing"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.tmpdir, 'monitor.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_missing_database_is_not_created(self):
+        """Test listing without a database returns nothing and creates no file"""
+        from users_db import list_monitored_users_readonly
+        self.assertEqual(list_monitored_users_readonly(self.db_file), [])
+        self.assertFalse(os.path.exists(self.db_file))
+
+    def test_lists_enabled_users(self):
+        """Test disabled users are only listed on request"""
+        import sqlite3
+        from users_db import list_monitored_users_readonly
+        conn = sqlite3.connect(self.db_file)
+        conn.executescript('''
+            CREATE TABLE monitored_users (username TEXT, last_check TEXT,
+                total_videos INTEGER, enabled INTEGER, last_video_timestamp INTEGER);
+            CREATE TABLE videos (id INTEGER PRIMARY KEY, author TEXT);
+            INSERT INTO monitored_users VALUES ('alice', NULL, 2, 1, 0);
+            INSERT INTO monitored_users VALUES ('bob', NULL, 1, 0, 0);
+            INSERT INTO videos (author) VALUES ('alice');
+        ''')
+        conn.close()
+
+        users = list_monitored_users_readonly(self.db_file)
+        self.assertEqual(users, [('alice', None, 2, 1, 0, 1)])
+        users = list_monitored_users_readonly(self.db_file, show_disabled=True)
+        self.assertEqual([u[0] for u in users], ['alice', 'bob'])
+
+
+
+# DOWNLOADER TESTS
+
+
+class _FakeYoutubeDL:
+    """Stand-in for yt_dlp.YoutubeDL; each test sets behaviour per URL"""
+
+    behaviour = {}  # url -> callable(url) returning an info dict or None, or raising
+    calls = []
+
+    def __init__(self, opts):
+        self.opts = opts
+
+    def extract_info(self, url, download=True):
+        _FakeYoutubeDL.calls.append(url)
+        action = self.behaviour.get(url)
+        if action is None:
+            return {'id': url, 'title': url}
+        return action(url)
+
+    def prepare_filename(self, info):
+        return info['id'] + '.mp4'
+
+    def close(self):
+        pass
+
+
+class TestBatchDownload(unittest.TestCase):
+    """Tests for TikTokDownloader batches, with yt-dlp faked out"""
+
+    def setUp(self):
+        from unittest import mock
+        import tiktok_downloader_advanced as downloader_module
+
+        self.module = downloader_module
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir, True)
+        _FakeYoutubeDL.behaviour = {}
+        _FakeYoutubeDL.calls = []
+        for patcher in (
+            mock.patch.object(downloader_module.yt_dlp, 'YoutubeDL', _FakeYoutubeDL),
+            # Retry immediately instead of waiting out the backoff
+            mock.patch.object(downloader_module, 'get_backoff_wait', lambda *a, **kw: 0),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.downloader = downloader_module.TikTokDownloader(
+            output_dir=self.tmpdir, max_workers=2
+        )
+
+    def _run_batch(self, urls):
+        """Run download_multiple, returning its results and the captured log"""
+        with self.assertLogs('TikTokMonitor', level='INFO') as logs:
+            results = self.downloader.download_multiple(urls)
+        return results, '\n'.join(logs.output)
+
+    def test_repeated_and_archived_videos_are_skipped(self):
+        """Test a repeated URL and an archived video count as skipped, not failed"""
+        _FakeYoutubeDL.behaviour['archived'] = lambda url: None  # In the download archive
+
+        results, output = self._run_batch(['new', 'archived', 'new'])
+
+        self.assertEqual(results[0], 'new.mp4')
+        self.assertIs(results[1], self.module.SKIPPED)
+        self.assertIs(results[2], self.module.SKIPPED)
+        self.assertEqual(_FakeYoutubeDL.calls.count('new'), 1)
+        self.assertIn('✅ Successful: 1/3', output)
+        self.assertIn('⏭️  Skipped: 2/3', output)
+        self.assertIn('❌ Failed: 0/3', output)
+
+    def test_results_keep_input_order(self):
+        """Test results follow the input order even when earlier videos finish last"""
+        import time
+
+        def slow(url):
+            time.sleep(0.1)
+            return {'id': url}
+        _FakeYoutubeDL.behaviour['first'] = slow
+
+        results, _ = self._run_batch(['first', 'second', 'third'])
+        self.assertEqual(results, ['first.mp4', 'second.mp4', 'third.mp4'])
+
+    def test_concurrency_limited_to_max_workers(self):
+        """Test no more than max_workers downloads run at once"""
+        import threading
+        import time
+
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+
+        def tracked(url):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return {'id': url}
+
+        urls = ['video%d' % i for i in range(8)]
+        for url in urls:
+            _FakeYoutubeDL.behaviour[url] = tracked
+
+        results, _ = self._run_batch(urls)
+        self.assertEqual(len(results), 8)
+        self.assertLessEqual(peak[0], 2)
+
+    def test_only_retryable_errors_are_retried(self):
+        """Test network errors are retried and a deleted video is not"""
+        attempts = []
+
+        def flaky(url):
+            attempts.append(url)
+            if len(attempts) == 1:
+                raise Exception("Connection timed out")
+            return {'id': url}
+
+        def deleted(url):
+            raise Exception("HTTP Error 404")
+
+        _FakeYoutubeDL.behaviour['flaky'] = flaky
+        _FakeYoutubeDL.behaviour['deleted'] = deleted
+
+        results, output = self._run_batch(['flaky', 'deleted'])
+        self.assertEqual(results, ['flaky.mp4', None])
+        self.assertEqual(_FakeYoutubeDL.calls.count('flaky'), 2)
+        self.assertEqual(_FakeYoutubeDL.calls.count('deleted'), 1)
+        self.assertIn('❌ Failed: 1/2', output)
+
+    def test_cancelled_batch_does_not_drain_queue(self):
+        """Test cancelling a batch returns at once and starts no queued downloads"""
+        import asyncio
+        import threading
+        import time
+
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def blocked(url):
+            release.wait(5)
+            return {'id': url}
+
+        urls = ['video%d' % i for i in range(10)]
+        for url in urls:
+            _FakeYoutubeDL.behaviour[url] = blocked
+
+        async def cancel_midway():
+            task = asyncio.ensure_future(self.downloader.download_multiple_async(urls))
+            while len(_FakeYoutubeDL.calls) < 2:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            start = time.monotonic()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return time.monotonic() - start
+
+        with self.assertLogs('TikTokMonitor', level='INFO'):
+            elapsed = asyncio.run(cancel_midway())
+            self.assertLess(elapsed, 1)
+
+            # Let the two running attempts finish: nothing queued may follow them
+            release.set()
+            time.sleep(0.1)
+        self.assertEqual(len(_FakeYoutubeDL.calls), 2)
 
 
 if __name__ == '__main__':
@@ -6,59 +6,128 @@ Version: 2.4 - Added user-friendly error handling
 """
 
 import argparse
+import asyncio
+import shutil
 import yt_dlp
-import os
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from logger_manager import logger
-from retry_utils import retry_on_network_error, retry_on_api_error, RetryContext
+from retry_utils import get_backoff_wait
+from format_utils import format_count
 from config_manager import get_config
 from error_handler import ErrorHandler, handle_error, is_retryable_error, get_retry_wait_time
 import time
 
 
+# Parallel downloads in download_multiple when neither --workers nor
+# download.parallel_workers is set
+DEFAULT_WORKERS = 4
+
+# Separator line of the batch banners
+_BAR = "=" * 60
+
+# Returned by download() for a video that was not downloaded again
+# (already in the download archive, or a repeated URL in a batch)
+SKIPPED = object()
+
+
+@lru_cache(maxsize=16)
+def _format_for(quality, force_convert=False):
+    """
+    Build the yt-dlp format string for a quality setting
+
+    Args:
+        quality: 'best', 'worst' or a maximum height
+        force_convert: Don't prefer formats that are already mp4
+
+    Returns:
+        str: yt-dlp format selector
+    """
+    format_string = 'best' if quality == 'best' else f'best[height<={quality}]'
+    if not force_convert:
+        # Prefer a native mp4 so the mp4 convertor has nothing to do
+        # (yt-dlp skips it for files already in the target format)
+        format_string = f'{format_string}[ext=mp4]/{format_string}'
+    return format_string
+
+
+def iter_urls(path):
+    """
+    Yield the non-empty lines of a URL file as they are read
+
+    Args:
+        path: File with one URL per line
+    """
+    with open(path, 'r') as f:
+        for line in f:
+            url = line.strip()
+            if url:
+                yield url
+
+
 class TikTokDownloader:
-    def __init__(self, output_dir=None, use_cookies=False, cookies_file=None, geo_bypass=None):
+    def __init__(self, output_dir=None, use_cookies=False, cookies_file=None, geo_bypass=None,
+                 max_workers=None, force_convert=False):
         # Use config if not specified
         if output_dir is None:
             output_dir = get_config('monitor.output_dir', './tiktok_downloads')
         if geo_bypass is None:
             geo_bypass = get_config('download.geo_bypass', True)
+        if max_workers is None:
+            max_workers = get_config('download.parallel_workers', DEFAULT_WORKERS)
+            if not isinstance(max_workers, int) or max_workers < 1:
+                logger.warning(
+                    "download.parallel_workers must be a positive integer, got %r; using %d",
+                    max_workers, DEFAULT_WORKERS
+                )
+                max_workers = DEFAULT_WORKERS
+        if max_workers < 1:
+            # Checked once here: download_multiple sizes its pool from it
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
 
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.use_cookies = use_cookies
         self.cookies_file = cookies_file
         self.geo_bypass = geo_bypass
-
-        logger.info(f"Downloader initialized: {output_dir}")
+        self.max_workers = max_workers
+        self.force_convert = force_convert
+        self.retry_backoff_factor = get_config('download.retry_backoff_factor', 2)
+        self.retry_backoff_cap = get_config('download.retry_backoff_cap', 600)
+        # Per-call defaults, resolved once rather than per URL
+        self.default_quality = get_config('download.quality', 'best')
+        self.default_with_audio = get_config('download.with_audio', True)
+
+        logger.info("Downloader initialized: %s", output_dir)
         if geo_bypass:
             logger.debug("Geo-bypass enabled (USA)")
         if use_cookies and cookies_file:
-            logger.debug(f"Using cookies: {cookies_file}")
+            logger.debug("Using cookies: %s", cookies_file)
 
-    def download(self, url, quality=None, with_audio=None, max_retries=3):
-        """
-        Download a TikTok video with user-friendly error handling and automatic retry
+        self._base_opts = self._build_base_opts()
+        self._pp_audio = [{
+            'key': 'FFmpegVideoConvertor',
+            'preferedformat': 'mp4',
+        }]
 
-        Args:
-            url: Video URL
-            quality: Video quality ('best', 'worst', or specific resolution)
-            with_audio: Include audio in download
-            max_retries: Maximum number of retry attempts
-            
-        Returns:
-            str: Path to downloaded file, or None if failed
+        # YoutubeDL instances are not thread-safe: each thread keeps its own,
+        # one per (format, with_audio), and close() releases all of them
+        self._local = threading.local()
+        self._ydls = []
+        self._ydls_lock = threading.Lock()
+
+    def _build_base_opts(self):
         """
-        # Use config if not specified
-        if quality is None:
-            quality = get_config('download.quality', 'best')
-        if with_audio is None:
-            with_audio = get_config('download.with_audio', True)
+        Build the yt-dlp options shared by every download of this instance
 
-        format_string = 'best' if quality == 'best' else f'best[height<={quality}]'
+        download() only adds the per-call format and postprocessors on top.
 
-        ydl_opts = {
-            'format': format_string,
+        Returns:
+            dict: Base yt-dlp options (treat as read-only)
+        """
+        opts = {
             'outtmpl': str(self.output_dir / '%(title)s.%(ext)s'),
             'quiet': True,
             'no_warnings': True,
@@ -71,109 +140,303 @@ class TikTokDownloader:
                 'Sec-Fetch-Mode': 'navigate',
             },
 
-            'postprocessors': [{
-                'key': 'FFmpegVideoConvertor',
-                'preferedformat': 'mp4',
-            }] if with_audio else [],
-
             'ignoreerrors': False,
+            # Videos recorded here are skipped by yt-dlp before any extraction
+            'download_archive': str(self.output_dir / '.ytdlp_archive'),
             'retries': 3,
             'fragment_retries': 3,
             'socket_timeout': 30,
         }
 
+        # Fetch pieces of a video in parallel: aria2c when it is installed
+        # (split range requests), otherwise yt-dlp's own concurrent fragments
+        fragments = get_config('download.fragment_concurrency', 8)
+        if fragments > 1 and shutil.which('aria2c'):
+            connections = str(min(fragments, 16))  # aria2c's per-server maximum
+            opts['external_downloader'] = {'default': 'aria2c'}
+            opts['external_downloader_args'] = {'aria2c': [
+                '-x', connections, '-s', connections, '-k', '1M', '--min-split-size=1M'
+            ]}
+            logger.debug("Using aria2c with %s connections", connections)
+        else:
+            opts['concurrent_fragment_downloads'] = max(1, fragments)
+
         if self.geo_bypass:
-            ydl_opts['geo_bypass'] = True
-            geo_country = get_config('download.geo_bypass_country', 'US')
-            ydl_opts['geo_bypass_country'] = geo_country
+            opts['geo_bypass'] = True
+            opts['geo_bypass_country'] = get_config('download.geo_bypass_country', 'US')
 
         if self.use_cookies and self.cookies_file:
-            if os.path.exists(self.cookies_file):
-                ydl_opts['cookiefile'] = self.cookies_file
-                logger.debug(f"Cookies loaded: {self.cookies_file}")
+            # Opening it once also rejects directories and unreadable files
+            try:
+                with open(self.cookies_file, 'rb'):
+                    pass
+            except OSError as e:
+                logger.warning("Cookie file not usable: %s (%s)", self.cookies_file, e.strerror)
             else:
-                logger.warning(f"Cookie file not found: {self.cookies_file}")
+                opts['cookiefile'] = self.cookies_file
+                logger.debug("Cookies loaded: %s", self.cookies_file)
+
+        return opts
+
+    def _get_ydl(self, format_string, with_audio):
+        """
+        Return this thread's YoutubeDL for the given options, creating it once
+
+        Reusing the instance keeps its extractors, cookie jar and HTTP
+        handlers across downloads instead of rebuilding them per video.
+        """
+        cache = getattr(self._local, 'ydls', None)
+        if cache is None:
+            cache = self._local.ydls = {}
+        key = (format_string, bool(with_audio))
+        ydl = cache.get(key)
+        if ydl is None:
+            ydl = yt_dlp.YoutubeDL({
+                **self._base_opts,
+                'format': format_string,
+                'postprocessors': self._pp_audio if with_audio else [],
+            })
+            cache[key] = ydl
+            with self._ydls_lock:
+                self._ydls.append(ydl)
+        return ydl
+
+    def close(self):
+        """Close every YoutubeDL created by this downloader"""
+        with self._ydls_lock:
+            ydls, self._ydls = self._ydls, []
+            self._local = threading.local()
+        for ydl in ydls:
+            ydl.close()
+
+    def _download_settings(self, quality, with_audio):
+        """
+        Resolve per-call download settings, falling back to the defaults
+
+        Returns:
+            tuple: (yt-dlp format string, with_audio)
+        """
+        # Use the configured defaults if not specified
+        if quality is None:
+            quality = self.default_quality
+        if with_audio is None:
+            with_audio = self.default_with_audio
+
+        return _format_for(quality, self.force_convert), with_audio
+
+    def _attempt(self, url, format_string, with_audio, attempt, max_retries):
+        """
+        Make a single (blocking) download attempt
+
+        Runs on whichever thread calls it and uses that thread's YoutubeDL.
+
+        Returns:
+            tuple: (result, wait_time) - wait_time is None once download()
+            should return result, otherwise the seconds to wait before the
+            next attempt
+        """
+        ydl = self._get_ydl(format_string, with_audio)
+        try:
+            logger.info("📥 Downloading: %s", url)
+            if attempt > 1:
+                logger.info("🔄 Retry attempt %d/%d", attempt, max_retries)
+            
+            logger.debug("Output: %s", self.output_dir)
+
+            info = ydl.extract_info(url, download=True)
+            if info is None:
+                # yt-dlp found the video ID in the download archive
+                logger.info("⏭️  Already downloaded: %s", url)
+                return SKIPPED, None
+            filename = ydl.prepare_filename(info)
+
+            # Success!
+            logger.success("Download completed!")
+            logger.info("📄 File: %s", filename)
+            logger.info("🎬 Title: %s", info.get('title', 'N/A'))
+            logger.info("👤 Author: %s", info.get('uploader', 'Unknown'))
+            # Counts may be present but None, so `or 0` rather than a get() default
+            logger.info("👁️  Views: %s", format_count(info.get('view_count') or 0))
+            logger.info("❤️  Likes: %s", format_count(info.get('like_count') or 0))
+            logger.info("💬 Comments: %s", format_count(info.get('comment_count') or 0))
+
+            return filename, None
+
+        except Exception as e:
+            # Analyze error with user-friendly handler
+            # (one lowercase pass + precompiled keyword matcher in error_handler)
+            user_error = handle_error(e, url, show_technical=(attempt == max_retries))
+            retryable = is_retryable_error(user_error)
+            
+            # Check if should retry
+            if attempt < max_retries and retryable:
+                # Error-specific first wait, growing with each attempt
+                wait_time = get_backoff_wait(
+                    get_retry_wait_time(user_error), attempt,
+                    factor=self.retry_backoff_factor, cap=self.retry_backoff_cap
+                )
+                logger.warning("⏳ Waiting %d seconds before retry...", wait_time)
+                return None, wait_time
+
+            # Max retries reached or non-retryable error
+            if not retryable:
+                logger.error("❌ This error cannot be automatically resolved")
+            else:
+                logger.error("❌ Max retries (%d) reached", max_retries)
+            return None, None
+
+    def download(self, url, quality=None, with_audio=None, max_retries=3):
+        """
+        Download a TikTok video with user-friendly error handling and automatic retry
+
+        Args:
+            url: Video URL
+            quality: Video quality ('best', 'worst', or specific resolution)
+            with_audio: Include audio in download
+            max_retries: Maximum number of retry attempts
+            
+        Returns:
+            str: Path to downloaded file, SKIPPED if it was downloaded
+            before, or None if failed
+        """
+        format_string, with_audio = self._download_settings(quality, with_audio)
 
         # Retry loop with user-friendly error handling
         for attempt in range(1, max_retries + 1):
-            try:
-                logger.info(f"📥 Downloading: {url}")
-                if attempt > 1:
-                    logger.info(f"🔄 Retry attempt {attempt}/{max_retries}")
-                
-                logger.debug(f"Output: {self.output_dir}")
-
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info = ydl.extract_info(url, download=True)
-                    filename = ydl.prepare_filename(info)
-
-                    # Success!
-                    logger.success("Download completed!")
-                    logger.info(f"📄 File: {filename}")
-                    logger.info(f"🎬 Title: {info.get('title', 'N/A')}")
-                    logger.info(f"👤 Author: {info.get('uploader', 'Unknown')}")
-                    logger.info(f"👁️  Views: {info.get('view_count', 0):,}")
-                    logger.info(f"❤️  Likes: {info.get('like_count', 0):,}")
-                    logger.info(f"💬 Comments: {info.get('comment_count', 0):,}")
-
-                    return filename
-
-            except Exception as e:
-                # Analyze error with user-friendly handler
-                user_error = handle_error(e, url, show_technical=(attempt == max_retries))
-                
-                # Check if should retry
-                if attempt < max_retries and is_retryable_error(user_error):
-                    wait_time = get_retry_wait_time(user_error)
-                    logger.warning(f"⏳ Waiting {wait_time} seconds before retry...")
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    # Max retries reached or non-retryable error
-                    if not is_retryable_error(user_error):
-                        logger.error("❌ This error cannot be automatically resolved")
-                    else:
-                        logger.error(f"❌ Max retries ({max_retries}) reached")
-                    
-                    return None
+            result, wait_time = self._attempt(url, format_string, with_audio, attempt, max_retries)
+            if wait_time is None:
+                return result
+            time.sleep(wait_time)
         
         return None
 
-    def download_multiple(self, urls):
-        """Download multiple videos with user-friendly error handling"""
+    async def download_async(self, url, quality=None, with_audio=None, max_retries=3,
+                             executor=None):
+        """
+        Coroutine version of download()
+
+        Each attempt runs in executor (the loop's default one if None), but
+        the wait between retries is an asyncio.sleep, so a backing-off
+        download does not hold a worker thread.
+
+        Returns:
+            Same as download()
+        """
+        loop = asyncio.get_running_loop()
+        format_string, with_audio = self._download_settings(quality, with_audio)
+
+        for attempt in range(1, max_retries + 1):
+            result, wait_time = await loop.run_in_executor(
+                executor, self._attempt, url, format_string, with_audio, attempt, max_retries
+            )
+            if wait_time is None:
+                return result
+            await asyncio.sleep(wait_time)
+
+        return None
+
+    def _log_banner(self, i, total):
+        """Log the batch position of a video"""
+        # One record, so parallel downloads can't interleave inside it
+        position = f"{i}/{total}" if total else str(i)
+        logger.info("\n%s\nVideo %s\n%s", _BAR, position, _BAR)
+
+    async def download_multiple_async(self, urls, total=None):
+        """
+        Download multiple videos with user-friendly error handling
+
+        Downloads are network-bound, so up to self.max_workers attempts run
+        at once on a thread pool; each thread uses its own YoutubeDL.
+        Downloads waiting to retry sleep on the event loop instead, and up
+        to as many again are admitted meanwhile, so a retry storm doesn't
+        stall the rest of the batch.
+
+        urls may be any iterable (e.g. iter_urls()): it is consumed lazily,
+        only as fast as downloads are admitted, so the first download starts
+        before a long URL file has been read. Repeated URLs are downloaded
+        only once; later copies are SKIPPED.
+
+        Args:
+            urls: Iterable of video URLs
+            total: Number of URLs, if known (defaults to len(urls) for lists)
+
+        Returns:
+            list: Result of download() for each URL, in input order
+        """
+        if total is None and hasattr(urls, '__len__'):
+            total = len(urls)
+        workers = min(self.max_workers, total) if total else self.max_workers
         results = []
-        successful = 0
-        failed = 0
-        skipped = 0
+        queued = set()
+        running = set()
+        admitted = asyncio.Semaphore(workers * 2)
 
-        logger.info(f"Starting batch download: {len(urls)} videos")
+        async def run(i, url):
+            try:
+                self._log_banner(i, total)
+                results[i - 1] = await self.download_async(url, executor=executor)
+            finally:
+                admitted.release()
 
-        for i, url in enumerate(urls, 1):
-            logger.info("")
-            logger.info("=" * 60)
-            logger.info(f"Video {i}/{len(urls)}")
-            logger.info("=" * 60)
+        if total:
+            logger.info("Starting batch download: %d videos", total)
+        else:
+            logger.info("Starting batch download")
 
-            result = self.download(url)
-            
-            if result:
-                results.append(result)
-                successful += 1
-            else:
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            for i, url in enumerate(urls, 1):
+                if url in queued:
+                    results.append(SKIPPED)
+                    continue
+                queued.add(url)
                 results.append(None)
-                failed += 1
-
-        # Summary
-        logger.info("")
-        logger.info("=" * 60)
-        logger.info("BATCH DOWNLOAD SUMMARY")
-        logger.info("=" * 60)
-        logger.info(f"✅ Successful: {successful}/{len(urls)}")
-        logger.info(f"❌ Failed: {failed}/{len(urls)}")
-        logger.info("=" * 60)
+                await admitted.acquire()
+                task = asyncio.ensure_future(run(i, url))
+                running.add(task)
+                task.add_done_callback(running.discard)
+            if running:
+                await asyncio.gather(*running)
+        except BaseException:
+            # Ctrl-C or cancellation: cancelling the tasks also cancels their
+            # queued attempts and retry sleeps; only attempts already running
+            # finish, and nothing waits for them here (no cancel_futures on 3.8)
+            for task in running:
+                task.cancel()
+            executor.shutdown(wait=False)
+            raise
+        executor.shutdown()
+        # The worker threads are gone, and so is any use for their instances
+        self.close()
+
+        count = len(results)
+        skipped = sum(1 for result in results if result is SKIPPED)
+        failed = sum(1 for result in results if result is None)
+        successful = count - skipped - failed
+
+        # Summary, as a single record
+        logger.info("\n".join((
+            "",
+            _BAR,
+            "BATCH DOWNLOAD SUMMARY",
+            _BAR,
+            f"✅ Successful: {successful}/{count}",
+            f"⏭️  Skipped: {skipped}/{count}",
+            f"❌ Failed: {failed}/{count}",
+            _BAR,
+        )))
 
         return results
 
+    def download_multiple(self, urls, total=None):
+        """
+        Blocking wrapper around download_multiple_async()
+
+        Must not be called from a running event loop; await
+        download_multiple_async() there instead.
+        """
+        return asyncio.run(self.download_multiple_async(urls, total))
+
 
 def export_cookies_instructions():
     """Show instructions for exporting cookies"""
@@ -210,6 +473,17 @@ NOTE: Cookies expire periodically, you may need to update them.
     print(instructions)
 
 
+def _positive_int(value):
+    """argparse type for counts that must be at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='TikTok Video Downloader v2.4 - With user-friendly error handling',
@@ -225,6 +499,9 @@ Examples:
   # Multiple downloads
   %(prog)s -f urls.txt --cookies tiktok_cookies.txt
 
+  # Multiple downloads, 4 at a time
+  %(prog)s -f urls.txt --workers 4
+
   # Specific quality (overrides config)
   %(prog)s --quality 720 https://www.tiktok.com/@user/video/123456789
 
@@ -252,6 +529,11 @@ Examples:
                         help='Show instructions for exporting cookies')
     parser.add_argument('--max-retries', type=int, default=3,
                         help='Maximum retry attempts (default: 3)')
+    parser.add_argument('--workers', type=_positive_int, default=None, metavar='N',
+                        help='Parallel downloads when using -f (overrides config, default: 4)')
+    parser.add_argument('--force-convert', action='store_true',
+                        help='Pick the best format in any container and convert it to mp4 with FFmpeg '
+                             '(default: prefer formats that are already mp4)')
     parser.add_argument('--debug', action='store_true',
                         help='Show technical error details')
 
@@ -269,16 +551,15 @@ Examples:
         output_dir,
         use_cookies=bool(args.cookies),
         cookies_file=args.cookies,
-        geo_bypass=geo_bypass
+        geo_bypass=geo_bypass,
+        max_workers=args.workers,
+        force_convert=args.force_convert
     )
 
     try:
         if args.file:
-            logger.info(f"Reading URLs from file: {args.file}")
-            with open(args.file, 'r') as f:
-                urls = [line.strip() for line in f if line.strip()]
-            logger.info(f"Found {len(urls)} URLs")
-            downloader.download_multiple(urls)
+            logger.info("Reading URLs from file: %s", args.file)
+            downloader.download_multiple(iter_urls(args.file))
 
         elif args.url:
             quality = args.quality if args.quality is not None else get_config('download.quality', 'best')
@@ -314,8 +595,10 @@ Examples:
     except KeyboardInterrupt:
         logger.info("\n❌ Download interrupted by user")
     except Exception as e:
-        logger.error(f"Fatal error: {str(e)}", exc_info=True)
+        logger.error("Fatal error: %s", e, exc_info=True)
         return 1
+    finally:
+        downloader.close()
 
     return 0
 
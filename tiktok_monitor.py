@@ -14,14 +14,16 @@ from datetime import datetime, timedelta
 import random
 import argparse
 import os
+import signal
 import sys
 import subprocess
 from logger_manager import logger
-from retry_utils import retry_on_network_error, retry_on_api_error, RetryContext, wait_with_jitter
+from retry_utils import retry_on_network_error, retry_on_api_error, RetryContext, wait_with_jitter, request_shutdown, clear_shutdown
 from notification_manager import notifier, notify_video
 from config_manager import get_config
 from error_handler import ErrorHandler, handle_error, is_retryable_error, get_retry_wait_time
 from daemon_manager import daemon
+from users_db import query_monitored_users
 
 
 class TikTokMonitor:
@@ -37,13 +39,17 @@ class TikTokMonitor:
         self.db_file = db_file
         self.init_database()
 
+        # YoutubeDL instances reused across checks and downloads (see _get_ydl)
+        self._ydls = {}
+
         # Load notification preference from database
         self._load_notification_preference()
 
         logger.info(f"Monitor initialized")
         logger.debug(f"Output directory: {output_dir}")
         logger.debug(f"Database: {db_file}")
-        logger.debug(f"Notifications: {notifier.get_status_text()}")
+        # Only the stored preference: probing availability would import plyer
+        logger.debug("Notifications: %s", "enabled" if notifier.enabled else "disabled")
 
     def init_database(self):
         """Initialize SQLite database for tracking videos and settings"""
@@ -244,30 +250,10 @@ class TikTokMonitor:
     def list_monitored_users(self, show_disabled=False):
         """List monitored users with details"""
         conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-
-        query = '''
-            SELECT 
-                m.username, 
-                m.last_check, 
-                m.total_videos, 
-                m.enabled,
-                m.last_video_timestamp,
-                COUNT(v.id) as db_videos
-            FROM monitored_users m
-            LEFT JOIN videos v ON m.username = v.author
-        '''
-
-        if not show_disabled:
-            query += ' WHERE m.enabled = 1'
-
-        query += ' GROUP BY m.username ORDER BY m.total_videos DESC'
-
-        cursor.execute(query)
-        users = cursor.fetchall()
-        conn.close()
-
-        return users
+        try:
+            return query_monitored_users(conn, show_disabled)
+        finally:
+            conn.close()
 
     def get_monitored_users(self):
         """Get list of active monitored users"""
@@ -337,6 +323,32 @@ class TikTokMonitor:
         conn.close()
         logger.debug(f"Saved metadata for video {video_id}")
 
+    def _get_ydl(self, key, build_opts):
+        """
+        Return the cached YoutubeDL for key, creating it on first use
+
+        Reusing one instance keeps its extractors, cookie jar and HTTP
+        handlers alive between videos instead of rebuilding them each time.
+
+        Args:
+            key: Cache key; must identify everything build_opts depends on
+            build_opts: Callable returning the yt-dlp options for a new instance
+
+        Returns:
+            yt_dlp.YoutubeDL: The shared instance
+        """
+        ydl = self._ydls.get(key)
+        if ydl is None:
+            ydl = self._ydls[key] = yt_dlp.YoutubeDL(build_opts())
+        return ydl
+
+    def close(self):
+        """Close the cached YoutubeDL instances"""
+        ydls = list(self._ydls.values())
+        self._ydls.clear()
+        for ydl in ydls:
+            ydl.close()
+
     def get_user_videos(self, username, max_videos=None):
         """
         Get latest videos from a user profile with user-friendly error handling
@@ -349,7 +361,7 @@ class TikTokMonitor:
 
         url = f"https://www.tiktok.com/@{username}"
 
-        ydl_opts = {
+        ydl = self._get_ydl(('videos', max_videos), lambda: {
             'quiet': True,
             'extract_flat': False,
             'playlistend': max_videos,
@@ -361,7 +373,7 @@ class TikTokMonitor:
             'skip_download': True,
             'socket_timeout': 30,
             'retries': 3,
-        }
+        })
 
         max_retries = 3
         last_error = None
@@ -370,24 +382,23 @@ class TikTokMonitor:
             try:
                 logger.debug(f"Fetching videos for @{username} (attempt {attempt}/{max_retries})")
 
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info = ydl.extract_info(url, download=False)
-
-                    if 'entries' in info:
-                        videos = []
-                        for entry in info['entries']:
-                            if entry:
-                                videos.append({
-                                    'id': entry.get('id', ''),
-                                    'url': entry.get('webpage_url', ''),
-                                    'title': entry.get('title', ''),
-                                    'timestamp': entry.get('timestamp', 0),
-                                    'upload_date': entry.get('upload_date', ''),
-                                })
-                        videos.sort(key=lambda x: x['timestamp'], reverse=True)
-                        logger.debug(f"Found {len(videos)} videos for @{username}")
-                        return videos, None
-                    return [], None
+                info = ydl.extract_info(url, download=False)
+
+                if 'entries' in info:
+                    videos = []
+                    for entry in info['entries']:
+                        if entry:
+                            videos.append({
+                                'id': entry.get('id', ''),
+                                'url': entry.get('webpage_url', ''),
+                                'title': entry.get('title', ''),
+                                'timestamp': entry.get('timestamp', 0),
+                                'upload_date': entry.get('upload_date', ''),
+                            })
+                    videos.sort(key=lambda x: x['timestamp'], reverse=True)
+                    logger.debug(f"Found {len(videos)} videos for @{username}")
+                    return videos, None
+                return [], None
 
             except Exception as e:
                 user_error = handle_error(e, url, username, show_technical=(attempt == max_retries))
@@ -411,7 +422,7 @@ class TikTokMonitor:
         Returns:
             tuple: (info, filepath, error_object or None)
         """
-        ydl_opts = {
+        ydl = self._get_ydl('download', lambda: {
             'format': get_config('download.quality', 'best'),
             'outtmpl': str(self.output_dir / '%(uploader)s_%(upload_date)s_%(title)s.%(ext)s'),
             'quiet': True,
@@ -423,7 +434,8 @@ class TikTokMonitor:
             'socket_timeout': 30,
             'retries': 3,
             'fragment_retries': 3,
-        }
+            'concurrent_fragment_downloads': max(1, get_config('download.fragment_concurrency', 8)),
+        })
 
         max_retries = 3
         last_error = None
@@ -433,10 +445,9 @@ class TikTokMonitor:
                 if attempt > 1:
                     logger.info(f"🔄 Retry attempt {attempt}/{max_retries}")
 
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info = ydl.extract_info(url, download=True)
-                    filename = ydl.prepare_filename(info)
-                    return info, filename, None
+                info = ydl.extract_info(url, download=True)
+                filename = ydl.prepare_filename(info)
+                return info, filename, None
 
             except Exception as e:
                 user_error = handle_error(e, url, username, show_technical=(attempt == max_retries))
@@ -581,12 +592,13 @@ class TikTokMonitor:
                         logger.download_complete(filepath, username)
 
                         # Send notification
-                        notify_video(
-                            username=username,
-                            title=info.get('title', 'Unknown'),
-                            views=info.get('view_count'),
-                            likes=info.get('like_count')
-                        )
+                        if notifier.enabled:
+                            notify_video(
+                                username=username,
+                                title=info.get('title', 'Unknown'),
+                                views=info.get('view_count'),
+                                likes=info.get('like_count')
+                            )
 
                         video_timestamp = info.get('timestamp', 0)
                         if video_timestamp > newest_timestamp:
@@ -688,7 +700,7 @@ class TikTokMonitor:
                             logger.warning(f"   @{user}: {err.error_type}")
 
                     # Send notification on first failure
-                    if consecutive_all_failed == 1:
+                    if consecutive_all_failed == 1 and notifier.enabled:
                         notifier.send(
                             title="⚠️ All Users Failed",
                             message=f"All {len(users)} users failed (cookies/geo-block?)\nCheck logs or fix issues",
@@ -712,11 +724,12 @@ class TikTokMonitor:
                         logger.critical("")
 
                         # Send critical notification
-                        notifier.send(
-                            title="🛑 Monitor STOPPED",
-                            message=f"All users failed {consecutive_all_failed} times\nUse VPN or export cookies",
-                            timeout=0
-                        )
+                        if notifier.enabled:
+                            notifier.send(
+                                title="🛑 Monitor STOPPED",
+                                message=f"All users failed {consecutive_all_failed} times\nUse VPN or export cookies",
+                                timeout=0
+                            )
 
                         # Exit immediately - don't raise, just return
                         return
@@ -744,6 +757,8 @@ class TikTokMonitor:
                 wait_with_jitter(base_wait, jitter_percent=0.1)
 
         except KeyboardInterrupt:
+            # Back to the menu: later waits must sleep normally again
+            clear_shutdown()
             logger.info("\n\n⚠️  Monitoring interrupted by user")
             logger.info("👋 Goodbye!")
 
@@ -918,7 +933,8 @@ def interactive_menu(monitor):
                 print(f"\n📋 Process Information:")
                 print(f"   PID: {status['pid']}")
                 print(f"   Started: {status['started']}")
-                print(f"   CPU Usage: {status['cpu']:.1f}%")
+                cpu = f"{status['cpu']:.1f}%" if status['cpu'] is not None else 'n/a'
+                print(f"   CPU Usage: {cpu}")
                 print(f"   Memory: {status['memory']:.1f} MB")
             print("=" * 60)
 
@@ -936,6 +952,12 @@ def interactive_menu(monitor):
             print("\n❌ Invalid choice!")
 
 
+def _handle_shutdown_signal(signum, frame):
+    """Cancel pending retry waits and unwind the main loop"""
+    request_shutdown()
+    raise KeyboardInterrupt
+
+
 def main():
     """Main function with interactive menu and daemon support"""
     parser = argparse.ArgumentParser(
@@ -1009,7 +1031,8 @@ New in v2.5:
             print(f"\n📋 Process Information:")
             print(f"   PID: {status['pid']}")
             print(f"   Started: {status['started']}")
-            print(f"   CPU Usage: {status['cpu']:.1f}%")
+            cpu = f"{status['cpu']:.1f}%" if status['cpu'] is not None else 'n/a'
+            print(f"   CPU Usage: {cpu}")
             print(f"   Memory: {status['memory']:.1f} MB")
         print("=" * 60)
         return
@@ -1039,30 +1062,31 @@ New in v2.5:
         if args.output:
             daemon_args.extend(['--output', args.output])
 
-        # Start daemon
-        result = daemon.start_daemon(daemon_args)
-
-        # On Unix, if we're the child process, we continue with monitoring
-        if result is None and os.name != 'nt':
-            # We ARE the daemon child process
-            monitor.start_monitoring(interval_minutes=args.interval)
-
+        # Start daemon (runs as a separate --auto process)
+        daemon.start_daemon(daemon_args)
         return
 
-    if args.auto:
-        monitor.start_monitoring(interval_minutes=args.interval)
+    # SIGTERM (e.g. --stop-daemon) shuts down as gracefully as Ctrl-C
+    signal.signal(signal.SIGINT, _handle_shutdown_signal)
+    signal.signal(signal.SIGTERM, _handle_shutdown_signal)
 
-    elif args.check_once:
-        users = monitor.get_monitored_users()
-        if not users:
-            logger.warning("No users to monitor!")
-            return
+    try:
+        if args.auto:
+            monitor.start_monitoring(interval_minutes=args.interval)
+
+        elif args.check_once:
+            users = monitor.get_monitored_users()
+            if not users:
+                logger.warning("No users to monitor!")
+                return
 
-        for username in users:
-            monitor.monitor_user(username)
+            for username in users:
+                monitor.monitor_user(username)
 
-    else:
-        interactive_menu(monitor)
+        else:
+            interactive_menu(monitor)
+    finally:
+        monitor.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Monitored-users queries shared by the monitor and manage_users.py
+
+Kept free of yt-dlp and the logger so read-only commands start quickly.
+"""
+
+import sqlite3
+from pathlib import Path
+from config_manager import get_config
+
+
+def query_monitored_users(conn, show_disabled=False):
+    """
+    Run the monitored-users listing query on an open connection
+
+    Args:
+        conn: sqlite3 connection to the monitor database
+        show_disabled: Include disabled users
+
+    Returns:
+        list: (username, last_check, total_videos, enabled,
+        last_video_timestamp, db_videos) rows, most videos first
+    """
+    cursor = conn.cursor()
+
+    query = '''
+        SELECT
+            m.username,
+            m.last_check,
+            m.total_videos,
+            m.enabled,
+            m.last_video_timestamp,
+            COUNT(v.id) as db_videos
+        FROM monitored_users m
+        LEFT JOIN videos v ON m.username = v.author
+    '''
+
+    if not show_disabled:
+        query += ' WHERE m.enabled = 1'
+
+    query += ' GROUP BY m.username ORDER BY m.total_videos DESC'
+
+    cursor.execute(query)
+    return cursor.fetchall()
+
+
+def list_monitored_users_readonly(db_file=None, show_disabled=False):
+    """
+    List monitored users without constructing a monitor
+
+    Opens the database read-only, so nothing is created or migrated.
+
+    Args:
+        db_file: Database path (defaults to database.db_file from config)
+        show_disabled: Include disabled users
+
+    Returns:
+        list: Same rows as query_monitored_users(), empty if no database
+    """
+    if db_file is None:
+        db_file = get_config('database.db_file', 'tiktok_monitor.db')
+
+    try:
+        conn = sqlite3.connect(f"{Path(db_file).absolute().as_uri()}?mode=ro", uri=True)
+    except sqlite3.OperationalError:
+        return []
+    try:
+        return query_monitored_users(conn, show_disabled)
+    except sqlite3.OperationalError:
+        return []  # Database exists but was never initialized
+    finally:
+        conn.close()